@@ -18,13 +18,15 @@ from flask import Flask, render_template
 from src.config import Config
 from src.api.routes import api_bp
 from src.api.error_handlers import register_error_handlers
-from src.session.manager import processing_sessions, session_lock, initialize_session_manager
+from src.api.json_provider import ORJSONProvider
+from src.session.manager import processing_sessions, initialize_session_manager
 from src.tasks.scheduler import start_cleanup_scheduler
 from src.queue_manager.worker_pool import WorkerPool
 
 # Initialize Flask application
 app = Flask(__name__)
 app.config.from_object(Config)
+app.json = ORJSONProvider(app)
 
 # Configure global logger
 if not os.path.exists('logs'):
@@ -50,7 +52,7 @@ main_logger.addHandler(global_log_handler)
 main_logger.setLevel(getattr(logging, Config.GLOBAL_LOG_LEVEL))
 
 # Initialize the global session manager with Flask app context
-initialize_session_manager(app, processing_sessions, session_lock)
+initialize_session_manager(app, processing_sessions)
 
 # Register primary index route at the root level '/'
 @app.route('/')
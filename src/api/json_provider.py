@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+UnityBundleExtractor - JSON Provider Module
+Author: lenzarchive (https://github.com/lenzarchive)
+License: MIT License
+
+This module defines a Flask JSON provider backed by orjson, used by `jsonify`
+for all API responses. The status endpoints are polled continuously by every
+open browser tab, so JSON encoding is on the busiest request path.
+Falls back to Flask's default stdlib-based provider when orjson is not installed.
+"""
+
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that serializes with orjson. Objects orjson can't handle natively
+    are passed through Flask's default conversion (dates, UUIDs, dataclasses, ...).
+    """
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        # Hand the encoded bytes straight to the response, skipping the str round-trip
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS),
+            mimetype=self.mimetype
+        )
@@ -9,25 +9,29 @@ It handles file uploads, displays analysis status, initiates asset extraction, a
 """
 
 import os
+import atexit
 import shutil
-import uuid
+import secrets
 import threading
 import json
 import traceback
 import logging
 from datetime import datetime, timedelta
 import time
-from typing import Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple
 
 from flask import Blueprint, request, jsonify, send_file, current_app, render_template, after_this_request
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
 
-from src.config import Config
-from src.utils import is_allowed_file_extension, get_file_info
 from src.bundle_processing.core_processor import BundleProcessor
-from src.session.manager import get_session_data, add_session_data, update_session_status, get_session_lock, remove_session_data
+from src.config import Config
+from src.utils import is_allowed_file_extension, get_file_info, copy_file_range_fd
+from src.session.manager import get_session_data, add_session_data, update_session_status, remove_session_data
 from src.queue_manager.task_queue import add_task_to_queue, get_queue_size, get_task_position, cancel_task_in_queue
+from src.tasks.scheduler import request_cleanup
 
 # Create a Blueprint for API routes
 api_bp = Blueprint('api', __name__, url_prefix='/api')
@@ -35,9 +39,49 @@ api_bp = Blueprint('api', __name__, url_prefix='/api')
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
-# In-memory dictionary for rate limiting
-last_request_times = {}
-rate_limit_lock = threading.Lock()
+# File extensions that identify the primary Unity bundle/asset file of an upload
+_BUNDLE_EXTENSIONS = ('.bundle', '.unity3d', '.assets', '.unitybundle', '.assetbundle')
+
+# Buffer size used when an uploaded file can't be copied with sendfile
+_UPLOAD_COPY_BUFFER_SIZE = 4 * 1024 * 1024  # 4 MB
+
+# Bounded pool for extraction jobs, so concurrent /extract calls queue up instead of each spawning a thread
+_extraction_executor = ThreadPoolExecutor(max_workers=Config.EXTRACTION_WORKERS, thread_name_prefix="Extraction")
+atexit.register(_extraction_executor.shutdown, wait=False)
+
+# Single background thread that removes directories of rejected uploads off the request path
+_cleanup_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="UploadCleanup")
+
+# In-memory request timestamps for rate limiting: one bounded deque per IP, holding the
+# times of its last RATE_LIMIT_PER_MINUTE admitted requests. Lookups and appends are single
+# dict/deque operations, which are atomic under the GIL, so the admit path takes no lock;
+# `_rate_limit_lock` only guards inserting a new IP and the janitor's sweep.
+last_request_times: Dict[str, deque] = {}
+_rate_limit_lock = threading.Lock()
+_rate_limit_janitor_started = False
+
+def _rate_limit_janitor():
+    """
+    Periodically drops IPs whose request history has fully expired,
+    so the rate limit table doesn't grow with every client ever seen.
+    """
+    while True:
+        time.sleep(Config.RATE_LIMIT_WINDOW_SECONDS)
+        cutoff = time.monotonic() - Config.RATE_LIMIT_WINDOW_SECONDS
+        with _rate_limit_lock:
+            stale_ips = [ip for ip, timestamps in list(last_request_times.items()) if not timestamps or timestamps[-1] <= cutoff]
+            for ip in stale_ips:
+                del last_request_times[ip]
+
+def _ensure_rate_limit_janitor():
+    """Starts the rate limit janitor thread on first use."""
+    global _rate_limit_janitor_started
+    if _rate_limit_janitor_started:
+        return
+    with _rate_limit_lock:
+        if not _rate_limit_janitor_started:
+            threading.Thread(target=_rate_limit_janitor, daemon=True, name="RateLimitJanitor").start()
+            _rate_limit_janitor_started = True
 
 def _check_rate_limit(ip_address: str) -> Tuple[bool, int]:
     """
@@ -53,22 +97,78 @@ def _check_rate_limit(ip_address: str) -> Tuple[bool, int]:
     if not Config.RATE_LIMIT_ENABLED:
         return False, 0
 
-    with rate_limit_lock:
-        current_time = time.time()
-        # Remove old requests outside the window
-        last_request_times[ip_address] = [
-            t for t in last_request_times.get(ip_address, [])
-            if current_time - t < Config.RATE_LIMIT_WINDOW_SECONDS
-        ]
-
-        if len(last_request_times[ip_address]) >= Config.RATE_LIMIT_PER_MINUTE:
-            # Calculate when the client can retry
-            oldest_request_time = last_request_times[ip_address][0]
-            retry_after = int(Config.RATE_LIMIT_WINDOW_SECONDS - (current_time - oldest_request_time))
+    _ensure_rate_limit_janitor()
+    timestamps = last_request_times.get(ip_address)
+    if timestamps is None:
+        with _rate_limit_lock:
+            timestamps = last_request_times.setdefault(ip_address, deque(maxlen=Config.RATE_LIMIT_PER_MINUTE))
+
+    current_time = time.monotonic()
+    if len(timestamps) == timestamps.maxlen:
+        # The oldest of the last N requests is still inside the window
+        elapsed = current_time - timestamps[0]
+        if elapsed < Config.RATE_LIMIT_WINDOW_SECONDS:
+            retry_after = int(Config.RATE_LIMIT_WINDOW_SECONDS - elapsed)
             return True, max(1, retry_after)
-        
-        last_request_times[ip_address].append(current_time)
-        return False, 0
+
+    # The bounded deque evicts the oldest timestamp on its own. The check above and this append are
+    # separate steps, so with N request threads one IP can be over-admitted by up to N-1 requests
+    # per window; accepted for this soft limit in exchange for a lock-free admit path.
+    timestamps.append(current_time)
+    return False, 0
+
+def _schedule_directory_removal(path: str):
+    """
+    Queues a directory tree for removal on the background cleanup thread,
+    so the request can respond without waiting for the recursive delete.
+
+    Args:
+        path (str): The directory to remove.
+    """
+    _cleanup_executor.submit(shutil.rmtree, path, ignore_errors=True)
+
+def _save_uploaded_file(file_item, save_path: str):
+    """
+    Writes an uploaded file to disk. When Werkzeug has already spooled the upload
+    to a temporary file, the data is copied kernel-side (reflink or sendfile, see
+    `copy_file_range_fd`); otherwise it falls back to a large-buffer copy instead of
+    FileStorage.save()'s 16 KB chunks.
+
+    Args:
+        file_item (FileStorage): The uploaded file from the request.
+        save_path (str): The destination path on disk.
+    """
+    src = file_item.stream
+    # SpooledTemporaryFile keeps its backing file (BytesIO or a real temp file) in `_file`
+    backing_file = getattr(src, '_file', src)
+    with open(save_path, 'wb', buffering=0) as dst:
+        try:
+            src_fd = backing_file.fileno()
+            offset = backing_file.tell()
+            copy_file_range_fd(src_fd, dst.fileno(), offset, os.fstat(src_fd).st_size - offset)
+            return
+        except (AttributeError, OSError):
+            # In-memory upload, or no kernel-side file copy on this platform
+            dst.seek(0)
+            dst.truncate()
+        shutil.copyfileobj(src, dst, _UPLOAD_COPY_BUFFER_SIZE)
+
+def _request_cleanup_on_low_disk():
+    """
+    Wakes the cleanup scheduler early when the upload volume is running low on free space,
+    instead of leaving expired sessions on disk until the next scheduled cleanup.
+    """
+    min_free = current_app.config['CLEANUP_MIN_FREE_MB'] * 1024 * 1024
+    if not min_free:
+        return
+    try:
+        free = shutil.disk_usage(current_app.config['UPLOAD_FOLDER']).free
+    except OSError as e:
+        logger.debug(f"Could not check free disk space: {e}")
+        return
+    if free < min_free:
+        logger.warning(f"Low disk space ({free // (1024 * 1024)} MB free); requesting an early cleanup.")
+        request_cleanup()
 
 @api_bp.route('/')
 def index_root():
@@ -110,16 +210,17 @@ def upload_bundle():
         logger.warning("Upload attempt without selected file.")
         return jsonify({'error': 'No file selected for uploading'}), 400
 
-    session_id = str(uuid.uuid4())
+    session_id = secrets.token_hex(16)
     session_upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], session_id)
     os.makedirs(session_upload_dir, exist_ok=True)
+    upload_accepted = False
     
     try:
-        all_uploaded_files = []
+        # (path, original name) of the first bundle/asset file, picked out while saving
+        primary_file = None
         for file_item in files:
             if file_item and file_item.filename:
                 if not is_allowed_file_extension(file_item.filename, current_app.config['ALLOWED_EXTENSIONS']):
-                    shutil.rmtree(session_upload_dir, ignore_errors=True)
                     logger.warning(f"Invalid file type uploaded: {file_item.filename}")
                     return jsonify({
                         'error': f'Invalid file type: {file_item.filename}. Allowed extensions are: {", ".join(current_app.config["ALLOWED_EXTENSIONS"])}'
@@ -127,24 +228,11 @@ def upload_bundle():
 
                 filename_secured = secure_filename(file_item.filename)
                 save_path = os.path.join(session_upload_dir, filename_secured)
-                file_item.save(save_path)
-                all_uploaded_files.append({'path': save_path, 'name': file_item.filename})
-        
-        primary_file = None
-        bundle_extensions = ['.bundle', '.unity3d', '.assets', '.unitybundle', '.assetbundle']
-        for f in all_uploaded_files:
-            if any(f['name'].lower().endswith(ext) for ext in bundle_extensions):
-                primary_file = f
-                break
-        
-        if not primary_file:
-            for f in all_uploaded_files:
-                 if f['name'].lower().endswith('.assets'):
-                    primary_file = f
-                    break
+                _save_uploaded_file(file_item, save_path)
+                if primary_file is None and file_item.filename.lower().endswith(_BUNDLE_EXTENSIONS):
+                    primary_file = (save_path, file_item.filename)
         
         if not primary_file:
-            shutil.rmtree(session_upload_dir, ignore_errors=True)
             logger.error("Upload failed: No main Unity bundle/asset file found among selected files.")
             raise ValueError("No main Unity bundle/asset file (.bundle, .unity3d, .assets, .unitybundle, .assetbundle) was found in the upload.")
 
@@ -152,7 +240,7 @@ def upload_bundle():
         allow_retention = request.form.get('allow_storage') == 'true'
 
         # Create a BundleProcessor instance and set its initial status to 'queued'
-        processor = BundleProcessor(session_id, primary_file['path'], primary_file['name'], session_upload_dir, current_app.config, send_log, allow_retention)
+        processor = BundleProcessor(session_id, primary_file[0], primary_file[1], session_upload_dir, current_app.config, send_log, allow_retention)
         processor.processing_status = "queued"
         
         # Add the processor instance to the global session manager
@@ -161,7 +249,9 @@ def upload_bundle():
         # Add the session ID to the task queue for a worker to pick up
         add_task_to_queue(session_id)
         
+        upload_accepted = True
         logger.info(f"Upload successful for session {session_id}. Task added to queue.")
+        _request_cleanup_on_low_disk()
         # Return 'queued' status along with current queue info
         return jsonify({
             'session_id': session_id,
@@ -171,13 +261,15 @@ def upload_bundle():
         })
 
     except RequestEntityTooLarge:
-        shutil.rmtree(session_upload_dir, ignore_errors=True)
         logger.error(f"Upload failed: File size exceeds limit of {current_app.config['MAX_CONTENT_LENGTH'] // 1024 // 1024}MB.")
         return jsonify({'error': f'File size exceeds the limit of {current_app.config["MAX_CONTENT_LENGTH"] // 1024 // 1024}MB'}), 413
     except Exception as e:
-        shutil.rmtree(session_upload_dir, ignore_errors=True)
         logger.error(f"Upload failed for session {session_id}: {e}", exc_info=True)
         return jsonify({'error': f'An unexpected error occurred during upload: {e}'}), 500
+    finally:
+        # Every rejected or failed upload leaves a partial session directory behind
+        if not upload_accepted:
+            _schedule_directory_removal(session_upload_dir)
 
 @api_bp.route('/status/<session_id>')
 def get_status(session_id: str):
@@ -225,7 +317,7 @@ def extract_assets():
 
     Request JSON Body:
         {
-            "session_id": "uuid-string",
+            "session_id": "32-char-hex-string",
             "selected_assets": [123, 456, 789] # List of asset indices
         }
 
@@ -248,9 +340,13 @@ def extract_assets():
     
     processor = session_data['processor']
 
-    # Directly call extract_selected_assets in a new thread
+    # Mark the job as started right away; it may wait for a free slot in the extraction pool
+    processor.processing_status = "extracting"
+    processor.progress = 0
+
+    # Run extract_selected_assets on the bounded extraction pool
     # We pass current_app._get_current_object() to ensure it has context.
-    threading.Thread(target=_extract_assets_async_task, args=(current_app._get_current_object(), processor, session_id, selected_indices), name=f"ExtractionThread-{session_id}").start()
+    _extraction_executor.submit(_extract_assets_async_task, current_app._get_current_object(), processor, session_id, selected_indices)
     
     logger.info(f"Extraction initiated for session {session_id} with {len(selected_indices)} assets.")
     return jsonify({'status': 'extraction_started'})
@@ -332,19 +428,26 @@ def download_assets(session_id: str):
         return jsonify({'error': 'File not found, may have been cleaned up'}), 404
     
     processor = session_data.get('processor')
-    if processor and not processor.allow_retention:
+    # With X-Sendfile the front-end server reads the file after this response returns,
+    # so immediate cleanup is left to the scheduled cleanup task instead.
+    if processor and not processor.allow_retention and not current_app.use_x_sendfile:
         @after_this_request
         def cleanup_session(response):
             try:
                 logger.info(f"Triggering immediate cleanup for session {session_id} after download.")
-                processor.cleanup()
-                remove_session_data(session_id)
+                # Only the caller that removed the session cleans up its processor
+                if remove_session_data(session_id) is not None:
+                    processor.cleanup()
             except Exception as e:
                 logger.error(f"Error during post-download cleanup for session {session_id}: {e}", exc_info=True)
             return response
 
     logger.info(f"Serving download for session {session_id} from {zip_path}.")
-    return send_file(zip_path, as_attachment=True, download_name=os.path.basename(zip_path))
+    # conditional/etag enable Range and If-None-Match handling. Resuming an interrupted download only
+    # works for retained sessions: without retention the session is removed after its first response.
+    # The file body itself is handed to wsgi.file_wrapper (sendfile) or to the proxy via X-Sendfile.
+    return send_file(zip_path, as_attachment=True, download_name=os.path.basename(zip_path),
+                     conditional=True, etag=True, max_age=0)
 
 # Queue management API endpoints
 @api_bp.route('/queue/cancel', methods=['POST'])
@@ -355,7 +458,7 @@ def cancel_queue_task():
 
     Request JSON Body:
         {
-            "session_id": "uuid-string"
+            "session_id": "32-char-hex-string"
         }
     """
     session_id = request.json.get('session_id')
@@ -369,8 +472,8 @@ def cancel_queue_task():
     
     processor = session_data['processor']
     
-    # Set cancellation flag on the processor instance
-    processor._is_cancelled = True
+    # Signal cancellation to the processor instance
+    processor.cancel()
     
     # Attempt to remove from the queue first (if it hasn't been picked up yet)
     was_removed_from_queue = cancel_task_in_queue(session_id)
@@ -9,46 +9,230 @@ from a directory containing extracted Unity assets.
 """
 
 import os
+import queue
 import zipfile
 import logging
+import threading
+from typing import List, Tuple
+
 from src.utils import sanitize_filename
 
-def create_archive(source_dir: str, original_bundle_name: str, output_folder: str, session_id: str, local_logger: logging.Logger) -> str:
+# Write buffer for the archive file, so large archives are flushed in few big write() calls
+_OUTPUT_BUFFER_SIZE = 1024 * 1024  # 1 MB
+
+# Deflate level for archive entries. Level 1 is several times faster than the default
+# and the exported assets gain little from harder compression.
+_DEFLATE_LEVEL = 1
+
+# Batches (one per exported asset) that may wait for the archive writer thread before producers block.
+# Only file lists are queued; the files themselves stay on disk until written.
+_MAX_PENDING_BATCHES = 256
+
+# Queued after the last batch to stop the writer thread
+_END_OF_FILES = object()
+
+# Extensions whose payload is already entropy-coded; these are stored without re-compression
+_STORED_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.ogg', '.mp3', '.flac', '.mp4', '.mov', '.mkv', '.flv',
+    '.webm', '.fsb', '.ktx', '.dds', '.zip'
+})
+
+def _compression_for(file_path: str) -> int:
     """
-    Creates a ZIP archive from the contents of a source directory.
+    Chooses the ZIP compression method for a file based on its extension.
+
+    Args:
+        file_path (str): The path of the file being archived.
+
+    Returns:
+        int: `zipfile.ZIP_STORED` for already-compressed formats, `zipfile.ZIP_DEFLATED` otherwise.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    return zipfile.ZIP_STORED if ext in _STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+def _collect_files(source_dir: str) -> List[Tuple[str, str, int]]:
+    """
+    Walks a directory tree once with os.scandir and lists every regular file in it.
+    The result is sorted by archive path, so entries are written in a stable order.
+
+    Args:
+        source_dir (str): The directory to walk.
+
+    Returns:
+        List[Tuple[str, str, int]]: Tuples of (file path, archive path, size in bytes).
+    """
+    files = []
+    # Each pending directory carries its archive path prefix, so entry names are built
+    # by concatenation instead of os.path.relpath on every file
+    pending_dirs = [(source_dir, '')]
+    while pending_dirs:
+        current_dir, arc_prefix = pending_dirs.pop()
+        with os.scandir(current_dir) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    pending_dirs.append((entry.path, f"{arc_prefix}{entry.name}/"))
+                elif entry.is_file(follow_symlinks=False):
+                    files.append((entry.path, arc_prefix + entry.name, entry.stat(follow_symlinks=False).st_size))
+    files.sort(key=lambda item: item[1])
+    return files
+
+def get_archive_path(original_bundle_name: str, output_folder: str, session_id: str) -> str:
+    """
+    Determines where a session's ZIP archive is written, creating its directory.
     The ZIP file is named based on the original bundle file and saved
     within a session-specific subdirectory.
 
     Args:
-        source_dir (str): The directory containing files to be zipped.
         original_bundle_name (str): The original filename of the uploaded bundle, used for naming the ZIP.
         output_folder (str): The base directory where the session's ZIP archive will be saved.
         session_id (str): The unique identifier for the current session.
-        local_logger (logging.Logger): The logger instance for recording messages.
 
     Returns:
-        str: The full path to the created ZIP archive.
+        str: The full path of the ZIP archive.
     """
     base_name = os.path.splitext(original_bundle_name)[0]
     sanitized_base_name = sanitize_filename(base_name)
-    
+
     if sanitized_base_name and sanitized_base_name != "Untitled":
-         zip_filename = f"{sanitized_base_name}_extracted.zip" 
+         zip_filename = f"{sanitized_base_name}_extracted.zip"
     else:
          zip_filename = f"unity_assets_{session_id}.zip"
 
     # Create a session-specific directory inside the main output folder
     session_output_dir = os.path.join(output_folder, session_id)
     os.makedirs(session_output_dir, exist_ok=True)
-    
+
     # Define the final path for the ZIP file inside the session directory
-    zip_path = os.path.join(session_output_dir, zip_filename)
-    
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, _, files in os.walk(source_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
-                arc_path = os.path.relpath(file_path, source_dir)
-                zipf.write(file_path, arc_path)
-    local_logger.info(f"Created ZIP archive: {zip_path}")
-    return zip_path
\ No newline at end of file
+    return os.path.join(session_output_dir, zip_filename)
+
+class StreamingArchiveWriter:
+    """
+    Writes a ZIP archive incrementally while its files are still being produced.
+    Files handed to `add_files` go through a bounded queue to the writer's own thread,
+    which streams them from disk, compresses them and appends them in submission order
+    through zipfile's public API. Entries are deflated one at a time: zipfile has no
+    public API for appending data compressed elsewhere.
+    """
+    def __init__(self, zip_path: str, local_logger: logging.Logger, remove_sources: bool = False,
+                 thread_name: str = "Archive"):
+        """
+        Opens the archive for writing and starts the writer thread.
+
+        Args:
+            zip_path (str): The path of the ZIP file to create.
+            local_logger (logging.Logger): The logger instance for recording messages.
+            remove_sources (bool): Delete each source file once it has been written to the archive.
+            thread_name (str): Name of the writer thread.
+        """
+        self.zip_path = zip_path
+        self.file_count = 0
+        self._logger = local_logger
+        self._remove_sources = remove_sources
+        self._output_file = open(zip_path, 'wb', buffering=_OUTPUT_BUFFER_SIZE)
+        self._zipf = zipfile.ZipFile(self._output_file, 'w', zipfile.ZIP_DEFLATED, compresslevel=_DEFLATE_LEVEL, allowZip64=True, strict_timestamps=False)
+        self._arc_names = set()
+        # Batches of files waiting for the writer thread; producers block once it is full
+        self._pending = queue.Queue(maxsize=_MAX_PENDING_BATCHES)
+        # Set by the writer thread when a write fails; later batches are discarded
+        self._error = None
+        self._aborted = False
+        self._thread = threading.Thread(target=self._run, name=thread_name, daemon=True)
+        self._thread.start()
+
+    def add_files(self, files: List[Tuple[str, str, int]]):
+        """
+        Queues files for the archive. Blocks only while the queue is full.
+        If an earlier write failed, raises that error instead.
+
+        Args:
+            files (List[Tuple[str, str, int]]): Tuples of (file path, archive path, size in bytes),
+                                               as returned by `_collect_files`.
+        """
+        if self._error is not None:
+            raise self._error
+        self._pending.put(files)
+
+    def add_directory(self, source_dir: str):
+        """
+        Queues every file below a directory, named by its path relative to that directory.
+
+        Args:
+            source_dir (str): The directory whose contents are added.
+        """
+        self.add_files(_collect_files(source_dir))
+
+    def _run(self):
+        """Writer thread: appends queued batches until the end marker arrives."""
+        while True:
+            files = self._pending.get()
+            if files is _END_OF_FILES:
+                return
+            if self._error is not None or self._aborted:
+                continue
+            try:
+                self._write_files(files)
+            except BaseException as e:
+                self._error = e
+
+    def _write_files(self, files: List[Tuple[str, str, int]]):
+        """Compresses files into the archive, streaming each from disk in chunks."""
+        for file_path, arc_path, _ in files:
+            if arc_path in self._arc_names:
+                # Two assets resolved to the same output name; the batch queued first keeps it
+                self._logger.debug(f"Skipping duplicate archive entry: {arc_path}")
+            else:
+                self._arc_names.add(arc_path)
+                self.file_count += 1
+                self._zipf.write(file_path, arc_path, compress_type=_compression_for(file_path), compresslevel=_DEFLATE_LEVEL)
+            if self._remove_sources:
+                os.remove(file_path)
+
+    def _finish(self):
+        """Stops the writer thread once it has taken every queued batch, then closes the archive."""
+        try:
+            if self._thread.is_alive():
+                self._pending.put(_END_OF_FILES)
+                self._thread.join()
+        finally:
+            try:
+                self._zipf.close()
+            finally:
+                self._output_file.close()
+
+    def close(self):
+        """Waits for all queued files, then writes the central directory and closes the file."""
+        self._finish()
+        if self._error is not None:
+            raise self._error
+
+    def abort(self):
+        """Discards queued files and closes the (incomplete) archive; it is discarded by the caller."""
+        self._aborted = True
+        self._finish()
+
+def create_archive(source_dir: str, original_bundle_name: str, output_folder: str, session_id: str, local_logger: logging.Logger) -> str:
+    """
+    Creates a ZIP archive from the contents of a source directory.
+    The ZIP file is named based on the original bundle file and saved
+    within a session-specific subdirectory.
+
+    Args:
+        source_dir (str): The directory containing files to be zipped.
+        original_bundle_name (str): The original filename of the uploaded bundle, used for naming the ZIP.
+        output_folder (str): The base directory where the session's ZIP archive will be saved.
+        session_id (str): The unique identifier for the current session.
+        local_logger (logging.Logger): The logger instance for recording messages.
+
+    Returns:
+        str: The full path to the created ZIP archive.
+    """
+    zip_path = get_archive_path(original_bundle_name, output_folder, session_id)
+    writer = StreamingArchiveWriter(zip_path, local_logger, thread_name=f"Archive-{session_id[:8]}")
+    try:
+        writer.add_directory(source_dir)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    local_logger.info(f"Created ZIP archive: {zip_path} ({writer.file_count} files)")
+    return zip_path
@@ -10,7 +10,7 @@ Unity asset object by routing it to the appropriate specialized exporter functio
 
 import logging
 import os
-from typing import Any
+from typing import Any, ContextManager, Dict, List, Optional, Tuple
 import traceback
 
 # Import individual exporter functions
@@ -24,63 +24,91 @@ from src.exporters.shader import export_shader
 from src.exporters.text_asset import export_text_asset
 from src.exporters.texture import export_texture
 from src.exporters.video import export_video
+from src.utils import NO_LOCK, sanitize_filename
 
 from ._object_namer import get_object_name
 
-def extract_single_asset_orchestrator(obj: Any, base_dir: str, local_logger: logging.Logger, debug_mode: bool) -> bool:
+# Explicitly map UnityPy object types to their dedicated exporter functions.
+# Types not listed here fall back to the generic TypeTree exporter.
+_EXPORTERS = {
+    "Texture2D": export_texture,
+    "Sprite": export_texture,
+    "Mesh": export_mesh_obj,
+    "AudioClip": export_audio,
+    "Font": export_font,
+    "Shader": export_shader,
+    "TextAsset": export_text_asset,
+    "MonoScript": export_mono_script,
+    "Material": export_material,
+    "VideoClip": export_video,
+    "MovieTexture": export_video,
+}
+
+def get_type_dir(base_dir: str, obj_type: str) -> str:
+    """
+    Returns the subdirectory of the output directory that holds assets of a given type.
+
+    Args:
+        base_dir (str): The base extraction output directory.
+        obj_type (str): The UnityPy object type name (e.g., "Texture2D").
+
+    Returns:
+        str: The path of the type-specific subdirectory.
+    """
+    return os.path.join(base_dir, sanitize_filename(obj_type))
+
+def extract_single_asset_orchestrator(obj: Any, base_dir: str, local_logger: logging.Logger, debug_mode: bool,
+                                      texture_metadata: Optional[List[Dict[str, Any]]] = None, binary_meshes: bool = False,
+                                      reader_lock: ContextManager = NO_LOCK, name_cache: Optional[Dict[Tuple[int, int], str]] = None) -> bool:
     """
     Orchestrates the extraction of a single Unity asset object.
     It routes the object to the appropriate specialized exporter function based on its type.
+    Safe to call from several threads at once for objects of one bundle, as long as they all pass
+    that bundle's `reader_lock`: every UnityPy read is serialized through it.
+    The type subdirectory (see `get_type_dir`) must already exist; callers create all of them up front.
 
     Args:
         obj (Any): The UnityPy object to extract.
         base_dir (str): The base directory where the extracted asset should be saved.
         local_logger (logging.Logger): The logger instance for recording messages.
         debug_mode (bool): Flag indicating if the application is in debug mode.
+        texture_metadata (Optional[List[Dict[str, Any]]]): If given, texture metadata records are
+                                                           collected here instead of written per texture.
+        binary_meshes (bool): Export meshes as binary PLY instead of text OBJ.
+        reader_lock (ContextManager): The lock guarding the UnityPy readers of the object's bundle.
+        name_cache (Optional[Dict[Tuple[int, int], str]]): Memoized object names of the bundle (see `get_object_name`).
 
     Returns:
         bool: True if the asset was successfully extracted, False otherwise.
     """
     obj_type = obj.type.name
-    obj_name = get_object_name(obj)
-    
-    # Create a subdirectory for the asset type within the base output directory
-    type_dir = os.path.join(base_dir, get_object_name(obj_type))
-    os.makedirs(type_dir, exist_ok=True)
-    output_path = os.path.join(type_dir, obj_name)
+    obj_name = None
     
     success = False
     try:
-        data = obj.read()
+        # Read once and name the object from the same data
+        with reader_lock:
+            data = obj.read()
+            obj_name = get_object_name(obj, data, name_cache)
         
-        # Explicitly map UnityPy object types to their dedicated exporter functions
-        if obj_type in ["Texture2D", "Sprite"]:
-            success = export_texture(data, output_path, debug_mode, local_logger)
-        elif obj_type == "Mesh":
-            success = export_mesh_obj(data, output_path, debug_mode, local_logger)
-        elif obj_type == "AudioClip":
-            success = export_audio(data, output_path, debug_mode, local_logger)
-        elif obj_type == "Font":
-            success = export_font(data, output_path, debug_mode, local_logger)
-        elif obj_type == "Shader":
-            success = export_shader(data, output_path, debug_mode, local_logger)
-        elif obj_type == "TextAsset":
-            success = export_text_asset(data, output_path, debug_mode, local_logger)
-        elif obj_type == "MonoScript":
-            success = export_mono_script(data, output_path, debug_mode, local_logger)
-        elif obj_type == "Material":
-            success = export_material(data, output_path, debug_mode, local_logger)
-        elif obj_type in ["VideoClip", "MovieTexture"]:
-            success = export_video(data, output_path, debug_mode, local_logger)
+        output_path = os.path.join(get_type_dir(base_dir, obj_type), obj_name)
+        exporter = _EXPORTERS.get(obj_type)
+        if exporter is export_texture and texture_metadata is not None:
+            success = export_texture(data, output_path, debug_mode, local_logger, metadata_sink=texture_metadata, reader_lock=reader_lock)
+        elif exporter is export_mesh_obj and binary_meshes:
+            success = export_mesh_obj(data, output_path, debug_mode, local_logger, binary=True, reader_lock=reader_lock)
+        elif exporter is not None:
+            success = exporter(data, output_path, debug_mode, local_logger, reader_lock=reader_lock)
         else:
             # Fallback to generic exporter for any unhandled or unknown types
-            success = export_generic(data, output_path, obj_type, debug_mode, local_logger)
+            success = export_generic(data, output_path, obj_type, debug_mode, local_logger, reader_lock=reader_lock)
 
-        if not success:
-            local_logger.warning(f"Exporter returned False for {obj_type} object: {obj_name}. No specific file format was saved.")
+        # Lazy %-style arguments: this runs once per asset, so skip building the message when filtered out
+        if not success and local_logger.isEnabledFor(logging.WARNING):
+            local_logger.warning("Exporter returned False for %s object: %s. No specific file format was saved.", obj_type, obj_name)
             
     except Exception as e:
-        local_logger.error(f"Failed to extract asset '{obj_name}' (Type: {obj_type}, PathID: {obj.path_id}): {e}", exc_info=debug_mode)
+        local_logger.error("Failed to extract asset '%s' (Type: %s, PathID: %s): %s", obj_name or f"{obj_type}_{obj.path_id}", obj_type, obj.path_id, e, exc_info=debug_mode)
         success = False
 
     return success
\ No newline at end of file
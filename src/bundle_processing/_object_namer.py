@@ -9,7 +9,7 @@ for a Unity object, utilizing naming conventions found in Unity projects.
 """
 
 import logging
-from typing import Any
+from typing import Any, Dict, Optional, Tuple
 import UnityPy # For UnityPy.files.ObjectReader type hint
 
 from src.utils import sanitize_filename # Import utility function
@@ -17,13 +17,17 @@ from src.utils import sanitize_filename # Import utility function
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
-def get_object_name(obj: Any) -> str:
+def get_object_name(obj: Any, data: Any = None, name_cache: Optional[Dict[Tuple[int, int], str]] = None) -> str:
     """
     Retrieves a descriptive name for a Unity object by checking various
     attributes within its data. It also sanitizes the name for safe file system use.
 
     Args:
         obj (Any): The UnityPy object instance (ObjectReader or Asset).
+        data (Any): The object's already read data, if the caller has it; read on demand otherwise.
+        name_cache (Optional[Dict[Tuple[int, int], str]]): Resolved names of the caller's bundle, keyed by
+            (id of the object's assets file, path_id). Both are fixed while the bundle stays loaded,
+            so each object is only read once for naming; the owner drops the cache with the bundle.
 
     Returns:
         str: A sanitized, descriptive name for the object.
@@ -32,9 +36,29 @@ def get_object_name(obj: Any) -> str:
     if isinstance(obj, str):
         return sanitize_filename(obj)
 
+    if name_cache is None:
+        return _resolve_object_name(obj, data)
+    key = (id(getattr(obj, 'assets_file', None)), obj.path_id)
+    name = name_cache.get(key)
+    if name is None:
+        name = name_cache[key] = _resolve_object_name(obj, data)
+    return name
+
+def _resolve_object_name(obj: Any, data: Any) -> str:
+    """
+    Looks up a descriptive name for a Unity object; the uncached body of `get_object_name`.
+
+    Args:
+        obj (Any): The UnityPy object instance (ObjectReader or Asset).
+        data (Any): The object's already read data, or None to read it here.
+
+    Returns:
+        str: A sanitized, descriptive name for the object.
+    """
     try:
-        # Read the object's data to access its attributes
-        data = obj.read()
+        # Read the object's data to access its attributes, unless the caller already did
+        if data is None:
+            data = obj.read()
         
         # Check common name attributes within the object's data
         name_attributes = ["m_Name", "name"]
@@ -15,17 +15,37 @@ import logging
 from datetime import datetime
 from collections import defaultdict
 import tempfile
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import traceback
-import threading # For _is_cancelled flag (Event is overkill, bool is fine)
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Import individual processing functions
 from ._bundle_loader import load_unity_environment, get_bundle_info
-from ._object_namer import get_object_name
 from ._asset_inventory_builder import build_asset_inventory
-from ._asset_extractor_orchestrator import extract_single_asset_orchestrator
-from ._archive_creator import create_archive
-from src.session.logger_setup import setup_session_logger
+from ._asset_extractor_orchestrator import extract_single_asset_orchestrator, get_type_dir
+from ._archive_creator import StreamingArchiveWriter, get_archive_path
+from src.session.logger_setup import setup_session_logger, close_session_logger
+from src.utils import write_bytes_file, dump_json_lines_bytes
+
+# Archive entry holding the metadata of every exported texture, one JSON record per line
+TEXTURE_METADATA_FILENAME = "textures_meta.jsonl"
+
+# Background threads that delete session directories, keeping recursive deletes
+# of large extraction trees off the request and worker threads
+_cleanup_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="SessionCleanup")
+
+def _remove_tree(path: str, description: str):
+    """
+    Deletes a directory tree if it exists. Runs on the cleanup executor.
+
+    Args:
+        path (str): The directory to remove.
+        description (str): What the directory is, for the log message.
+    """
+    if os.path.exists(path):
+        shutil.rmtree(path, ignore_errors=True)
+        logging.getLogger(__name__).debug(f"Removed {description}: {path}")
 
 class BundleProcessor:
     """
@@ -58,7 +78,13 @@ class BundleProcessor:
         self.error_message = None
         self.progress = 0
         self.app_config = app_config
-        self._is_cancelled = False
+        # Serializes access to this session's UnityPy environment across inventory and export threads.
+        # Each session has its own, so sessions processed by different workers never wait on each other.
+        self.reader_lock = threading.RLock()
+        # Object names resolved from this session's bundle, shared by the inventory and the exports
+        self._name_cache: Dict[Tuple[int, int], str] = {}
+        # Set once the user cancels; checked by the coordinating thread and by export threads
+        self._cancel_event = threading.Event()
         self.send_log = send_log
         self.allow_retention = allow_retention
 
@@ -71,10 +97,20 @@ class BundleProcessor:
             self.logger.propagate = False
 
         self.export_stats = {'success': 0, 'failed': 0, 'skipped': 0}
+        # Export threads update `export_stats` concurrently
+        self._stats_lock = threading.Lock()
+
+    def cancel(self):
+        """Requests cancellation; running stages stop at their next cancellation check."""
+        self._cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        """Returns True once cancellation has been requested."""
+        return self._cancel_event.is_set()
 
     def _check_cancellation(self):
         """Raises an exception if the task has been cancelled."""
-        if self._is_cancelled:
+        if self._cancel_event.is_set():
             self.logger.info(f"Processing for session {self.session_id} cancelled.")
             self.processing_status = "cancelled"
             self.error_message = "Task cancelled by user."
@@ -82,6 +118,33 @@ class BundleProcessor:
             self.cleanup() 
             raise InterruptedError("Task cancelled by user.")
 
+    def _log_failure(self, message: str, error: Exception) -> str:
+        """
+        Logs a failure with its traceback, formatting the stack only once: in debug mode the
+        formatted traceback is both logged and returned for the client-facing error message.
+
+        Args:
+            message (str): The log message.
+            error (Exception): The exception being handled.
+
+        Returns:
+            str: The error details to show to the client.
+        """
+        if self.app_config['DEBUG_MODE']:
+            details = traceback.format_exc()
+            self.logger.error(f"{message}\n{details}")
+            return details
+        self.logger.error(message, exc_info=True)
+        return str(error)
+
+    def _on_inventory_progress(self, processed: int, total: int, partial_inventory: Dict[str, List[Dict]]):
+        """
+        Progress callback for `build_asset_inventory`: maps inventory progress onto
+        the 60-90% band of the analysis and stops the build if the task was cancelled.
+        """
+        self.progress = 60 + int(30 * processed / total)
+        self._check_cancellation()
+
     def analyze_bundle(self):
         """
         Orchestrates the analysis of the Unity bundle.
@@ -101,12 +164,21 @@ class BundleProcessor:
             self._check_cancellation() # Check during process
             self.progress = 40
 
+            # Kept as a list rather than a lazy view: the inventory visits every object right away,
+            # and extraction fetches the selected objects by index
             self.objects = list(self.env.objects)
             self.logger.info(f"Found {len(self.objects)} objects in bundle.")
             self._check_cancellation() # Check during process
             self.progress = 60
             
-            asset_inventory = build_asset_inventory(self.objects, self.logger, self.app_config['DEBUG_MODE'])
+            asset_inventory = build_asset_inventory(
+                self.objects, self.logger, self.app_config['DEBUG_MODE'],
+                accurate_size=self.app_config.get('ACCURATE_SIZE_ESTIMATE', False),
+                max_workers=self.app_config['ASSET_EXPORT_THREADS'],
+                on_progress=self._on_inventory_progress,
+                reader_lock=self.reader_lock,
+                name_cache=self._name_cache
+            )
             self._check_cancellation() # Check during process
             self.progress = 90
             
@@ -137,15 +209,60 @@ class BundleProcessor:
             self.cleanup() # Ensure cleanup on cancellation
         except Exception as e:
             self.processing_status = "error"
-            self.error_message = f"Analysis failed: {traceback.format_exc() if self.app_config['DEBUG_MODE'] else str(e)}"
-            self.logger.error(f"Analysis failed for {self.bundle_path}:", exc_info=True)
+            details = self._log_failure(f"Analysis failed for {self.bundle_path}:", e)
+            self.error_message = f"Analysis failed: {details}"
             self.cleanup()
 
+    def _export_asset(self, asset_index: int, texture_metadata: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        Exports one asset into its own staging directory and records the outcome.
+        Runs on the extraction thread pool.
+
+        Args:
+            asset_index (int): The index of the asset in `self.objects`.
+            texture_metadata (List[Dict[str, Any]]): Collects the metadata records of exported textures.
+
+        Returns:
+            Optional[str]: The staging directory holding the asset's files, or None if cancelled.
+        """
+        if self._cancel_event.is_set():
+            return None
+        obj = self.objects[asset_index]
+        # A private staging directory identifies exactly the files this asset's export wrote.
+        # Two mkdir calls: the staging directory and the one type subdirectory the exporter writes into.
+        staging_dir = os.path.join(self.output_dir, str(asset_index))
+        os.mkdir(staging_dir)
+        os.mkdir(get_type_dir(staging_dir, obj.type.name))
+        success = extract_single_asset_orchestrator(obj, staging_dir, self.logger, self.app_config['DEBUG_MODE'], texture_metadata,
+                                                    binary_meshes=self.app_config.get('MESH_BINARY_PLY', False), reader_lock=self.reader_lock,
+                                                    name_cache=self._name_cache)
+        with self._stats_lock:
+            self.export_stats['success' if success else 'failed'] += 1
+        if not success:
+            self.logger.warning(f"Export function returned False for asset index {asset_index} ({obj.type.name}).")
+        return staging_dir
+
+    def _add_texture_metadata(self, archive_writer: StreamingArchiveWriter, texture_metadata: List[Dict[str, Any]]):
+        """
+        Writes the collected texture metadata as a single NDJSON file and adds it to the archive.
+
+        Args:
+            archive_writer (StreamingArchiveWriter): The archive being built for this extraction.
+            texture_metadata (List[Dict[str, Any]]): The metadata records of the exported textures.
+        """
+        # Exports finish in any order; sort so the file is stable across runs
+        texture_metadata.sort(key=lambda record: record['asset'])
+        payload = dump_json_lines_bytes(texture_metadata)
+        metadata_path = os.path.join(self.output_dir, TEXTURE_METADATA_FILENAME)
+        write_bytes_file(metadata_path, payload)
+        archive_writer.add_files([(metadata_path, TEXTURE_METADATA_FILENAME, len(payload))])
+        self.logger.debug(f"Saved metadata for {len(texture_metadata)} textures to {TEXTURE_METADATA_FILENAME}.")
+
     def extract_selected_assets(self, selected_indices: List[int]) -> str:
         """
         Orchestrates the extraction of assets specified by their indices.
-        Each asset is exported to a temporary directory, and then all
-        exported assets are packaged into a single ZIP archive.
+        Each asset is exported to a temporary directory, and its files are streamed
+        into the session's ZIP archive as soon as the export finishes.
         """
         try:
             self._check_cancellation() # Check at the start
@@ -156,31 +273,59 @@ class BundleProcessor:
             self.output_dir = tempfile.mkdtemp(prefix=f"extract_{self.session_id}_", dir=self.app_config['OUTPUT_FOLDER'])
             self.logger.debug(f"Temporary extraction directory created: {self.output_dir}")
 
-            total_assets = len(selected_indices)
-            for i, asset_index in enumerate(selected_indices):
-                self._check_cancellation() # Check during loop
+            self.export_stats = {'success': 0, 'failed': 0, 'skipped': 0}
+            valid_indices = []
+            for asset_index in selected_indices:
                 if asset_index < 0 or asset_index >= len(self.objects):
                     self.logger.warning(f"Invalid asset index {asset_index} received. Skipping.")
+                    self.export_stats['skipped'] += 1
                     continue
+                valid_indices.append(asset_index)
+            # Each asset gets its own staging directory, so duplicate selections are exported once
+            valid_indices = list(dict.fromkeys(valid_indices))
+            # Progress counts the exports actually submitted; guard against an empty selection
+            total_assets = max(len(valid_indices), 1)
 
-                obj = self.objects[asset_index]
-                success = extract_single_asset_orchestrator(obj, self.output_dir, self.logger, self.app_config['DEBUG_MODE'])
-                
-                if success:
-                    self.export_stats['success'] += 1
-                else:
-                    self.export_stats['failed'] += 1
-                    self.logger.warning(f"Export function returned False for asset {get_object_name(obj)} ({obj.type.name}).")
-
-                self.progress = int(((i + 1) / total_assets) * 90)
-                
-            self._check_cancellation() # Check before zipping
-            self.progress = 95
-            zip_path = create_archive(self.output_dir, self.original_filename, self.app_config['OUTPUT_FOLDER'], self.session_id, self.logger)
+            # The archive is written while assets are still being exported: the writer's own thread
+            # compresses and appends (then deletes) each asset's files once they are queued,
+            # instead of a second pass over the whole output directory.
+            zip_path = get_archive_path(self.original_filename, self.app_config['OUTPUT_FOLDER'], self.session_id)
+            archive_writer = StreamingArchiveWriter(zip_path, self.logger, remove_sources=True, thread_name=f"Archive-{self.session_id[:8]}")
+
+            # Exports are independent, so they run on a thread pool; image encoding and file
+            # writes overlap while UnityPy reads are serialized inside the orchestrator.
+            executor = ThreadPoolExecutor(max_workers=self.app_config['ASSET_EXPORT_THREADS'], thread_name_prefix=f"Export-{self.session_id[:8]}")
+            try:
+                # Texture metadata goes into one archive entry instead of a small file per texture
+                texture_metadata = []
+                futures = [executor.submit(self._export_asset, asset_index, texture_metadata) for asset_index in valid_indices]
+                # Exports finish in any order, but their files are queued for the archive in selection
+                # order: if two assets resolve to the same entry name, the first selected one is kept.
+                # Export threads never wait on the archive; only this thread hands it work.
+                for completed, future in enumerate(futures, start=1):
+                    if self._cancel_event.is_set():
+                        break
+                    staging_dir = future.result()
+                    if staging_dir is not None:
+                        archive_writer.add_directory(staging_dir)
+                    self.progress = int((completed / total_assets) * 90)
+                executor.shutdown(wait=True, cancel_futures=True)
+
+                self._check_cancellation() # Check before finalizing the archive
+                self.progress = 95
+                if texture_metadata:
+                    self._add_texture_metadata(archive_writer, texture_metadata)
+                archive_writer.close()
+            except BaseException:
+                # Drop pending exports and wait for running ones before discarding the partial archive
+                executor.shutdown(wait=True, cancel_futures=True)
+                archive_writer.abort()
+                raise
+            self.logger.info(f"Created ZIP archive: {zip_path} ({archive_writer.file_count} files)")
             self.progress = 100
             self.processing_status = "completed"
             
-            self.logger.info(f"Extraction successful. Archive created at: {zip_path}")
+            self.logger.info(f"Extraction successful. Archive created at: {zip_path} (stats: {self.export_stats})")
             return zip_path
         except InterruptedError: # Catch explicit cancellation
             self.processing_status = "cancelled"
@@ -190,8 +335,8 @@ class BundleProcessor:
             raise # Re-raise to ensure calling function also knows
         except Exception as e:
             self.processing_status = "error"
-            self.error_message = f"Extraction failed: {traceback.format_exc() if self.app_config['DEBUG_MODE'] else str(e)}"
-            self.logger.error(f"Extraction failed for session {self.session_id}: {e}", exc_info=True)
+            details = self._log_failure(f"Extraction failed for session {self.session_id}: {e}", e)
+            self.error_message = f"Extraction failed: {details}"
             self.cleanup()
             raise
         finally:
@@ -204,35 +349,29 @@ class BundleProcessor:
         """
         Removes all temporary files and directories associated with this session.
         This includes uploaded files, extracted output, and session-specific logs.
+        The directory trees are deleted on a background thread, so this returns immediately.
         """
         # Use the global logger for cleanup, as the session logger might be part of what's being deleted.
         global_logger = logging.getLogger(__name__)
         global_logger.info(f"Initiating full cleanup for session {self.session_id}.")
         try:
             # 1. Remove the session's upload directory
-            session_upload_dir = os.path.join(self.app_config['UPLOAD_FOLDER'], self.session_id)
-            if os.path.exists(session_upload_dir):
-                shutil.rmtree(session_upload_dir, ignore_errors=True)
-                global_logger.debug(f"Removed upload directory: {session_upload_dir}")
+            _cleanup_executor.submit(_remove_tree, os.path.join(self.app_config['UPLOAD_FOLDER'], self.session_id), "upload directory")
 
             # 2. Remove the final ZIP archive directory for the session
-            session_zip_dir = os.path.join(self.app_config['OUTPUT_FOLDER'], self.session_id)
-            if os.path.exists(session_zip_dir):
-                shutil.rmtree(session_zip_dir, ignore_errors=True)
-                global_logger.debug(f"Removed session ZIP directory: {session_zip_dir}")
+            _cleanup_executor.submit(_remove_tree, os.path.join(self.app_config['OUTPUT_FOLDER'], self.session_id), "session ZIP directory")
+
+            # 3. Drop this session's memoized object names, whose keys are only valid while its bundle is loaded
+            self._name_cache.clear()
 
-            # 3. Close and remove session logger handlers to release file locks
-            for handler in self.logger.handlers[:]:
-                handler.close()
-                self.logger.removeHandler(handler)
+            # 4. Close and remove session logger handlers to release file locks.
+            # Done synchronously: the log directory must not be deleted under an open handler.
+            close_session_logger(self.logger)
 
-            # 4. Remove the session's log directory (if logging was enabled)
+            # 5. Remove the session's log directory (if logging was enabled)
             if self.send_log:
-                log_dir_path = os.path.join(self.app_config['SESSION_LOGS_DIR'], self.session_id)
-                if os.path.exists(log_dir_path):
-                    shutil.rmtree(log_dir_path, ignore_errors=True)
-                    global_logger.debug(f"Removed session log directory: {log_dir_path}")
+                _cleanup_executor.submit(_remove_tree, os.path.join(self.app_config['SESSION_LOGS_DIR'], self.session_id), "session log directory")
 
-            global_logger.info(f"Cleanup completed for session {self.session_id}.")
+            global_logger.info(f"Cleanup scheduled for session {self.session_id}.")
         except Exception as e:
             global_logger.warning(f"Cleanup warning for session {self.session_id}: {e}", exc_info=True)
\ No newline at end of file
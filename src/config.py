@@ -18,14 +18,17 @@ class Config:
     MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 500 * 1024 * 1024))  # 500 MB
     UPLOAD_FOLDER = 'uploads'
     OUTPUT_FOLDER = 'extractions'
-    ALLOWED_EXTENSIONS = {
+    # Immutable so the shared set can be read from every request thread without copying
+    ALLOWED_EXTENSIONS = frozenset({
         'bundle', 'unity3d', 'assets', 'unitybundle', 'assetbundle', 'ress', 
         'resource', 'dat', 'bin', 'txt', 'bytes', 'json', 'xml', 'yaml', 
         'csv', 'shader', 'font', 'audio', 'video'
-    }
+    })
 
     CLEANUP_INTERVAL = int(os.environ.get('CLEANUP_INTERVAL', 3600))  # 1 hour in seconds
     FILE_RETENTION_HOURS = int(os.environ.get('FILE_RETENTION_HOURS', 24))
+    # Uploads wake the cleanup scheduler early when the upload volume has less free space than this (0 disables)
+    CLEANUP_MIN_FREE_MB = int(os.environ.get('CLEANUP_MIN_FREE_MB', 1024))
 
     DEBUG_MODE = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     
@@ -34,12 +37,25 @@ class Config:
     SESSION_LOGS_DIR = 'logs/sessions'
     SESSION_LOG_LEVEL = 'DEBUG'  # Detailed logging for individual sessions
 
+    # Estimate asset sizes during analysis by actually encoding each asset (slow, exact)
+    # instead of deriving them from raw data lengths (fast, approximate)
+    ACCURATE_SIZE_ESTIMATE = os.environ.get('ACCURATE_SIZE_ESTIMATE', 'False').lower() == 'true'
+
+    # Export meshes as binary little-endian PLY instead of text OBJ; much faster for very large meshes
+    MESH_BINARY_PLY = os.environ.get('MESH_BINARY_PLY', 'False').lower() == 'true'
+
     SECRET_KEY = os.environ.get('SECRET_KEY', 'default-dev-secret-key-change-in-production')
 
+    # Let a front-end server (Apache/lighttpd X-Sendfile, or nginx mapping it to X-Accel-Redirect)
+    # stream ZIP downloads instead of the Python process
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', 'False').lower() == 'true'
+
     # Rate Limiting Configuration for /api/upload endpoint
     RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
     RATE_LIMIT_PER_MINUTE = int(os.environ.get('RATE_LIMIT_PER_MINUTE', 10)) # Max requests per minute
     RATE_LIMIT_WINDOW_SECONDS = 60 # Window for rate limit, default 60 seconds (1 minute)
 
     # Worker Pool Configuration
-    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 2)) # Number of internal worker threads for queue processing
\ No newline at end of file
+    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 2)) # Number of internal worker threads for queue processing
+    EXTRACTION_WORKERS = int(os.environ.get('EXTRACTION_WORKERS', 4)) # Max concurrent asset extraction jobs
+    ASSET_EXPORT_THREADS = int(os.environ.get('ASSET_EXPORT_THREADS', os.cpu_count() or 2)) # Export threads within one extraction job
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+UnityBundleExtractor - Magic Bytes Module
+Author: lenzarchive (https://github.com/lenzarchive)
+License: MIT License
+
+This module provides a shared helper for detecting file formats from the
+signature bytes at fixed offsets of a payload, along with the signature
+tables used by the exporters.
+"""
+
+from typing import Dict, Tuple
+
+# A signature is a tuple of (offset, signature bytes) pairs that must all match, so container
+# formats can check both their container header and their form type.
+Signature = Tuple[Tuple[int, bytes], ...]
+
+# Signature tables map signatures to a file extension.
+# Entries are checked in insertion order, so more specific signatures go first.
+MAGIC_AUDIO: Dict[Signature, str] = {
+    ((0, b'OggS'),): 'ogg',
+    ((0, b'RIFF'), (8, b'WAVE')): 'wav',
+    ((0, b'RF64'), (8, b'WAVE')): 'wav',  # 64-bit RIFF variant for files over 4 GB
+    ((0, b'fLaC'),): 'flac',
+    ((0, b'ID3'),): 'mp3',
+    ((0, b'\xff\xfb'),): 'mp3',
+    ((0, b'\xff\xf3'),): 'mp3',
+}
+
+MAGIC_FONT: Dict[Signature, str] = {
+    ((0, b'OTTO'),): 'otf',
+    ((0, b'\x00\x01\x00\x00'),): 'ttf',
+    ((0, b'true'),): 'ttf',
+}
+
+MAGIC_VIDEO: Dict[Signature, str] = {
+    ((4, b'ftyp'),): 'mp4',
+    ((0, b'RIFF'), (8, b'WAVE')): 'wav',
+    ((0, b'FLV'),): 'flv',
+    ((0, b'\x1a\x45'),): 'mkv',  # EBML header (Matroska/WebM)
+}
+
+def detect(data: bytes, table: Dict[Signature, str], default: str = 'unknown') -> str:
+    """
+    Detects a file format by matching signature bytes at their offsets.
+    Matching uses `bytes.startswith` with an offset, so no slices are allocated.
+
+    Args:
+        data (bytes): The payload (or at least its leading bytes).
+        table (Dict[Signature, str]): A signature table such as `MAGIC_AUDIO`.
+        default (str): The value returned when no signature matches.
+
+    Returns:
+        str: The extension of the first signature whose parts all match, or `default`.
+    """
+    for signature, ext in table.items():
+        for offset, expected in signature:
+            if not data.startswith(expected, offset):
+                break
+        else:
+            return ext
+    return default
@@ -8,13 +8,19 @@ This module provides a standalone function for exporting Unity AudioClip assets.
 """
 
 import os
-import json
 import logging
-from typing import Any
+from typing import Any, ContextManager
+
+from src.utils import NO_LOCK, write_bytes_file, dump_json_bytes, object_fields
+
+from ._magic import detect, MAGIC_AUDIO
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
+# AudioClip fields copied into the metadata file
+_METADATA_FIELDS = ('m_Channels', 'm_Frequency', 'm_Length', 'm_CompressionFormat')
+
 def _detect_audio_format(audio_data: bytes) -> str:
     """
     Detects common audio file formats from their binary data headers.
@@ -25,15 +31,10 @@ def _detect_audio_format(audio_data: bytes) -> str:
     Returns:
         str: The detected file extension (e.g., 'ogg', 'wav', 'mp3') or 'unknown'.
     """
-    if len(audio_data) < 4: return 'unknown'
-    header = audio_data[:4]
-    if header == b'OggS': return 'ogg'
-    if header[:4] == b'RIFF' and len(audio_data) >= 12 and audio_data[8:12] == b'WAVE': return 'wav'
-    if header == b'fLaC': return 'flac'
-    if audio_data.startswith(b'ID3') or audio_data[0:2] == b'\xff\xfb' or audio_data[0:2] == b'\xff\xf3': return 'mp3'
-    return 'unknown'
+    return detect(audio_data, MAGIC_AUDIO)
 
-def export_audio(data: Any, output_path: str, debug_mode: bool, local_logger: logging.Logger) -> bool:
+def export_audio(data: Any, output_path: str, debug_mode: bool, local_logger: logging.Logger,
+                 reader_lock: ContextManager = NO_LOCK) -> bool:
     """
     Exports an AudioClip asset to its native audio file format based on detected header.
 
@@ -42,34 +43,35 @@ def export_audio(data: Any, output_path: str, debug_mode: bool, local_logger: lo
         output_path (str): The base path for the output file (without extension).
         debug_mode (bool): Flag indicating if the application is in debug mode.
         local_logger (logging.Logger): The logger instance for recording messages.
+        reader_lock (ContextManager): Guards the bundle's UnityPy readers; held while payloads are loaded.
 
     Returns:
         bool: True if the audio clip was successfully exported, False otherwise.
     """
     try:
         local_logger.debug(f"Attempting to export AudioClip: {output_path}")
-        if not hasattr(data, 'm_AudioData') or not data.m_AudioData:
+        with reader_lock:
+            audio_data = getattr(data, 'm_AudioData', None)
+        if not audio_data:
             local_logger.debug(f"AudioClip {output_path} has no audio data, skipping.")
             return False
         
-        audio_data = data.m_AudioData
         audio_format = _detect_audio_format(audio_data)
         ext = f".{audio_format}" if audio_format != 'unknown' else '.audio'
         
-        with open(f"{output_path}{ext}", 'wb') as f:
-            f.write(audio_data)
+        write_bytes_file(f"{output_path}{ext}", audio_data)
             
         # Save audio metadata
+        fields = object_fields(data, _METADATA_FIELDS)
         metadata = {
             'format': audio_format,
             'size_bytes': len(audio_data),
-            'channels': getattr(data, 'm_Channels', 0),
-            'frequency': getattr(data, 'm_Frequency', 0),
-            'length_seconds': getattr(data, 'm_Length', 0.0),
-            'compression': str(getattr(data, 'm_CompressionFormat', 'Unknown'))
+            'channels': fields.get('m_Channels', 0),
+            'frequency': fields.get('m_Frequency', 0),
+            'length_seconds': fields.get('m_Length', 0.0),
+            'compression': str(fields.get('m_CompressionFormat', 'Unknown'))
         }
-        with open(f"{output_path}_meta.json", 'w') as f:
-            json.dump(metadata, f, indent=2)
+        write_bytes_file(f"{output_path}_meta.json", dump_json_bytes(metadata))
 
         local_logger.debug(f"AudioClip {output_path} saved as {ext}.")
         return True
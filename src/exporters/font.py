@@ -8,14 +8,18 @@ This module provides a standalone function for exporting Unity Font assets.
 """
 
 import os
-import json
 import logging
-from typing import Any
+from typing import Any, ContextManager
+
+from src.utils import NO_LOCK, write_bytes_file, dump_json_bytes, object_fields
+
+from ._magic import detect, MAGIC_FONT
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
-def export_font(data: Any, output_path: str, debug_mode: bool, local_logger: logging.Logger) -> bool:
+def export_font(data: Any, output_path: str, debug_mode: bool, local_logger: logging.Logger,
+                reader_lock: ContextManager = NO_LOCK) -> bool:
     """
     Exports a Font asset to a .ttf or .otf file based on detected font header.
 
@@ -24,33 +28,30 @@ def export_font(data: Any, output_path: str, debug_mode: bool, local_logger: log
         output_path (str): The base path for the output file (without extension).
         debug_mode (bool): Flag indicating if the application is in debug mode.
         local_logger (logging.Logger): The logger instance for recording messages.
+        reader_lock (ContextManager): Guards the bundle's UnityPy readers; held while payloads are loaded.
 
     Returns:
         bool: True if the font was successfully exported, False otherwise.
     """
     try:
         local_logger.debug(f"Attempting to export Font: {output_path}")
-        if not hasattr(data, 'm_FontData') or not data.m_FontData:
+        with reader_lock:
+            font_data = getattr(data, 'm_FontData', None)
+        if not font_data:
             local_logger.debug(f"Font {output_path} has no font data, skipping.")
             return False
         
-        font_data = data.m_FontData
-        header = font_data[:4]
-        ext = '.font'
-        if header == b'OTTO': ext = '.otf'
-        elif header in [b'\x00\x01\x00\x00', b'true']: ext = '.ttf'
+        ext = f".{detect(font_data, MAGIC_FONT, 'font')}"
         
-        with open(f"{output_path}{ext}", 'wb') as f:
-            f.write(font_data)
+        write_bytes_file(f"{output_path}{ext}", font_data)
 
         # Save font metadata
         metadata = {
             'format': ext[1:],
             'size_bytes': len(font_data),
-            'font_name': getattr(data, 'm_Name', 'Unknown'),
+            'font_name': object_fields(data, ('m_Name',)).get('m_Name', 'Unknown'),
         }
-        with open(f"{output_path}_meta.json", 'w') as f:
-            json.dump(metadata, f, indent=2)
+        write_bytes_file(f"{output_path}_meta.json", dump_json_bytes(metadata))
 
         local_logger.debug(f"Font {output_path} saved as {ext}.")
         return True
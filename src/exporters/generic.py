@@ -9,52 +9,105 @@ or those not handled by specific exporters, typically as a JSON representation
 of their internal structure (TypeTree).
 """
 
-import json
+import sys
 import logging
-from typing import Any
+from typing import Any, ContextManager
+
+from src.utils import NO_LOCK, write_bytes_file, dump_json_bytes
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
+# Exact types returned unchanged; checked with one set lookup before the isinstance fallbacks
+_PRIMITIVE_TYPES = frozenset({str, int, float, bool, type(None)})
+
+# Sentinel for attribute lookups, so presence and value come from one getattr call
+_MISSING = object()
+
+# Last seen attribute layout of each class, with its public attribute names. Instances of a
+# UnityPy class almost always share one layout, so the '_' filtering runs once per class;
+# an instance with another layout replaces the entry, so the cache holds one layout per class.
+_public_names_cache = {}
+
+# Nesting limit for serialization; deeper values (e.g. reference cycles) are replaced by a marker.
+# Kept below orjson's 255-level limit, so serialized objects never need the slower stdlib encoder.
+_MAX_DEPTH = 250
+
+def _public_attribute_names(cls: type, attributes: dict) -> tuple:
+    """Returns the attribute names of an instance `__dict__` that don't start with '_'."""
+    layout = tuple(attributes)
+    cached = _public_names_cache.get(cls)
+    # Same-class instances share their key strings, so this comparison is mostly identity checks
+    if cached is not None and cached[0] == layout:
+        return cached[1]
+    names = tuple(sys.intern(name) for name in layout if not name.startswith('_'))
+    _public_names_cache[cls] = (layout, names)
+    return names
+
 def _serialize_object(data: Any) -> Any:
     """
-    A recursive helper function to serialize complex Unity objects into a JSON-friendly format.
+    A helper function to serialize complex Unity objects into a JSON-friendly format.
     Handles nested objects, lists, and UnityPy's PPtr (Pointer) objects.
+    Walks the structure with an explicit stack, so deep nesting can't exhaust the Python call stack.
     """
-    if data is None: return None
-    if isinstance(data, (str, int, float, bool)): return data
-    if isinstance(data, bytes):
+    root = [None]
+    # Frames of (container to fill, key or index in it, value to convert, nesting depth)
+    stack = [(root, 0, data, 0)]
+    while stack:
+        container, key, value, depth = stack.pop()
+
+        if type(value) in _PRIMITIVE_TYPES or isinstance(value, (str, int, float, bool)):
+            container[key] = value
+            continue
+        if isinstance(value, bytes):
+            container[key] = value.decode('utf-8', errors='replace')
+            continue
+        if depth >= _MAX_DEPTH:
+            container[key] = '<max depth exceeded>'
+            continue
+
+        if isinstance(value, (list, tuple)):
+            items = [None] * len(value)
+            container[key] = items
+            stack.extend((items, i, item, depth + 1) for i, item in enumerate(value))
+            continue
+        if isinstance(value, dict):
+            # Keys are inserted up front so the output keeps the source order
+            out = {}
+            container[key] = out
+            for item_key, item in value.items():
+                if type(item_key) is str:
+                    item_key = sys.intern(item_key)
+                out[item_key] = None
+                stack.append((out, item_key, item, depth + 1))
+            continue
+
+        path_id = getattr(value, 'path_id', _MISSING)
+        if path_id is not _MISSING:
+            file_id = getattr(value, 'file_id', _MISSING)
+            if file_id is not _MISSING:
+                container[key] = {'type': 'ObjectReference', 'file_id': file_id, 'path_id': str(path_id)}
+            else:
+                container[key] = {'type': 'ObjectReference', 'path_id': str(path_id)}
+            continue
+
+        attributes = getattr(value, '__dict__', _MISSING)
+        if attributes is not _MISSING:
+            out = {}
+            container[key] = out
+            for attr_name in _public_attribute_names(type(value), attributes):
+                out[attr_name] = None
+                stack.append((out, attr_name, attributes[attr_name], depth + 1))
+            continue
+
         try:
-            return data.decode('utf-8', errors='replace')
+            container[key] = str(value)
         except Exception:
-            return f"<binary data: {len(data)} bytes>"
-    if isinstance(data, (list, tuple)):
-        return [_serialize_object(item) for item in data]
-    if isinstance(data, dict):
-        return {key: _serialize_object(value) for key, value in data.items()}
-    
-    if hasattr(data, 'path_id'):
-        if hasattr(data, 'file_id'):
-            return {
-                'type': 'ObjectReference',
-                'file_id': getattr(data, 'file_id', 0),
-                'path_id': str(data.path_id)
-            }
-        else:
-            return {'type': 'ObjectReference', 'path_id': str(data.path_id)}
-
-    if hasattr(data, '__dict__'):
-        return {
-            key: _serialize_object(value)
-            for key, value in data.__dict__.items()
-            if not key.startswith('_')
-        }
-    try:
-        return str(data)
-    except Exception:
-        return 'Unserializable Object'
+            container[key] = 'Unserializable Object'
+    return root[0]
 
-def export_generic(data: Any, output_path: str, obj_type: str, debug_mode: bool, local_logger: logging.Logger) -> bool:
+def export_generic(data: Any, output_path: str, obj_type: str, debug_mode: bool, local_logger: logging.Logger,
+                   reader_lock: ContextManager = NO_LOCK) -> bool:
     """
     A generic exporter for any Unity object type not handled by specific methods.
     It attempts to read the object's TypeTree and saves it as a JSON file,
@@ -66,25 +119,32 @@ def export_generic(data: Any, output_path: str, obj_type: str, debug_mode: bool,
         obj_type (str): The name of the Unity object type (e.g., "GameObject", "MonoBehaviour").
         debug_mode (bool): Flag indicating if the application is in debug mode.
         local_logger (logging.Logger): The logger instance for recording messages.
+        reader_lock (ContextManager): Guards the bundle's UnityPy readers; held while payloads are loaded.
 
     Returns:
         bool: True if the generic object was successfully exported, False otherwise.
     """
     try:
         local_logger.debug(f"Exporting generic object '{obj_type}': {output_path}")
-        
-        try:
-            type_tree_data = data.read_typetree()
-        except Exception as e:
-            local_logger.debug(f"Failed to read typetree for {output_path} ({obj_type}), falling back to generic serialization: {e}")
-            type_tree_data = _serialize_object(data)
+
+        # read_typetree seeks the bundle's shared reader, and serialization may touch lazily loaded
+        # attributes, so both run under the reader lock; JSON encoding and the write run unlocked
+        with reader_lock:
+            try:
+                # No schema cache here: UnityPy parses each SerializedType's node tree once when the
+                # file is loaded and every instance of that type reuses it
+                type_tree_data = data.read_typetree()
+            except Exception as e:
+                # Individual objects can fail (e.g. stripped or corrupt data), so this stays per object
+                local_logger.debug(f"Failed to read typetree for {output_path} ({obj_type}), falling back to generic serialization: {e}")
+                type_tree_data = _serialize_object(data)
         
         if not type_tree_data:
             local_logger.debug(f"Object {output_path} ({obj_type}) has no data to export, skipping.")
             return False
         
-        with open(f"{output_path}.json", 'w', encoding='utf-8') as f:
-            json.dump(type_tree_data, f, indent=2, ensure_ascii=False, default=str)
+        # TypeTrees can be large and deeply nested; orjson encodes them several times faster
+        write_bytes_file(f"{output_path}.json", dump_json_bytes(type_tree_data))
         
         local_logger.debug(f"Generic object {output_path} ({obj_type}) saved as JSON.")
         return True
@@ -4,122 +4,263 @@ UnityBundleExtractor - Mesh Exporter Module
 Author: lenzarchive (https://github.com/lenzarchive)
 License: MIT License
 
-This module provides a standalone function for exporting Unity Mesh assets to OBJ format.
+This module provides a standalone function for exporting Unity Mesh assets to OBJ format,
+or optionally to binary PLY.
 """
 
 import os
-import json
 import logging
-from typing import Any, Optional
+from typing import Any, ContextManager, Optional
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+from src.utils import NO_LOCK, write_bytes_file, dump_json_bytes
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
+# Write buffer for .obj files, so large meshes are flushed in few big write() calls
+_OBJ_WRITE_BUFFER_SIZE = 1024 * 1024  # 1 MB
+
+# Rows formatted per %-operation when writing a section; bounds the size of the
+# temporary format string and output text for very large meshes
+_ROWS_PER_CHUNK = 65536
+
+# Nine significant digits round-trip every float32 value, which is what Unity stores
+_FLOAT_FMT = "%.9g"
+
+def _vertex_array(vertices, components: int = 3) -> np.ndarray:
+    """
+    Converts per-vertex attributes into an (N, components) float array. Accepts a flat
+    list (x, y, z, x, y, z, ...) or a sequence of per-vertex tuples/vectors.
+    """
+    try:
+        arr = np.asarray(vertices, dtype=np.float64)
+    except (TypeError, ValueError):
+        # Ragged per-vertex sequences; keep only entries with enough components
+        arr = np.array([tuple(v)[:components] for v in vertices if len(v) >= components], dtype=np.float64)
+    if arr.ndim == 1:
+        return arr[:len(arr) - len(arr) % components].reshape(-1, components)
+    return arr.reshape(len(arr), -1)[:, :components]
+
+# Below this many vertices the NumPy reductions are already cheap enough
+_NUMBA_BOUNDS_MIN_VERTICES = 1024
+
+if njit is not None:
+    @njit(cache=True, boundscheck=False)
+    def _bounds_nb(v):
+        """Computes the per-axis minimum and maximum of an (N, 3) array in a single pass."""
+        mn0 = mx0 = v[0, 0]
+        mn1 = mx1 = v[0, 1]
+        mn2 = mx2 = v[0, 2]
+        for i in range(1, v.shape[0]):
+            x = v[i, 0]
+            y = v[i, 1]
+            z = v[i, 2]
+            if x < mn0:
+                mn0 = x
+            elif x > mx0:
+                mx0 = x
+            if y < mn1:
+                mn1 = y
+            elif y > mx1:
+                mx1 = y
+            if z < mn2:
+                mn2 = z
+            elif z > mx2:
+                mx2 = z
+        return mn0, mn1, mn2, mx0, mx1, mx2
+else:
+    _bounds_nb = None
+
+def _write_rows(f, arr: np.ndarray, row_fmt: str):
+    """
+    Writes every row of a 2D array using a %-style row format. Rows are formatted
+    in chunks with a single %-operation each, instead of one per row as
+    `np.savetxt` does.
+
+    Args:
+        f: The open text file to write to.
+        arr (np.ndarray): The rows to write.
+        row_fmt (str): The format for one row, including its trailing newline.
+    """
+    for start in range(0, len(arr), _ROWS_PER_CHUNK):
+        chunk = arr[start:start + _ROWS_PER_CHUNK]
+        f.write((row_fmt * len(chunk)) % tuple(chunk.ravel().tolist()))
+
+def _sized(values):
+    """Returns `values`, or an empty list if it is None."""
+    return [] if values is None else values
+
 def _calculate_bounds(vertices) -> Optional[dict]:
     """
     Calculates the axis-aligned bounding box (AABB) for a given set of vertices.
     """
-    if not vertices:
+    if not len(vertices):
         return None
-    min_coords = [float('inf')] * 3
-    max_coords = [float('-inf')] * 3
-    for vertex in vertices:
-        if len(vertex) >= 3:
-            for i in range(3):
-                min_coords[i] = min(min_coords[i], vertex[i])
-                max_coords[i] = max(max_coords[i], vertex[i])
+    arr = _vertex_array(vertices)
+    if not len(arr):
+        return None
+    if _bounds_nb is not None and len(arr) > _NUMBA_BOUNDS_MIN_VERTICES:
+        # One pass over a contiguous buffer instead of two reductions with temporaries
+        bounds = _bounds_nb(np.ascontiguousarray(arr))
+        min_coords = np.array(bounds[:3])
+        max_coords = np.array(bounds[3:])
+    else:
+        min_coords = arr.min(axis=0)
+        max_coords = arr.max(axis=0)
     
     return {
-        'min': min_coords,
-        'max': max_coords,
-        'center': [(min_coords[i] + max_coords[i]) / 2 for i in range(3)],
-        'size': [max_coords[i] - min_coords[i] for i in range(3)]
+        'min': min_coords.tolist(),
+        'max': max_coords.tolist(),
+        'center': ((min_coords + max_coords) * 0.5).tolist(),
+        'size': (max_coords - min_coords).tolist()
     }
 
-def export_mesh_obj(data: Any, output_path: str, debug_mode: bool, local_logger: logging.Logger) -> bool:
+def _write_ply(path: str, vertices: np.ndarray, normals: Optional[np.ndarray], uvs: Optional[np.ndarray], faces: np.ndarray):
     """
-    Exports a Mesh asset to a Wavefront .obj file. Includes vertex, normal,
-    and UV data if available. Also generates a metadata JSON file.
+    Writes a mesh as a binary little-endian PLY file. Vertex attributes are interleaved into
+    one float32 record array and faces into one record array, each dumped with a single tofile().
+
+    Args:
+        path (str): The file to write.
+        vertices (np.ndarray): (N, 3) vertex positions.
+        normals (Optional[np.ndarray]): (N, 3) vertex normals, or None.
+        uvs (Optional[np.ndarray]): (N, 2) texture coordinates, or None.
+        faces (np.ndarray): (M, 3) zero-based vertex indices.
+    """
+    columns = [vertices]
+    properties = ['x', 'y', 'z']
+    if normals is not None:
+        columns.append(normals)
+        properties += ['nx', 'ny', 'nz']
+    if uvs is not None:
+        columns.append(uvs)
+        properties += ['s', 't']
+    vertex_block = np.ascontiguousarray(np.hstack(columns), dtype='<f4')
+
+    face_block = np.empty(len(faces), dtype=[('count', 'u1'), ('indices', '<i4', (3,))])
+    face_block['count'] = 3
+    face_block['indices'] = faces
+
+    header = ["ply", "format binary_little_endian 1.0", "comment exported by UnityBundleExtractor",
+              f"element vertex {len(vertex_block)}"]
+    header += [f"property float {name}" for name in properties]
+    header += [f"element face {len(face_block)}", "property list uchar int vertex_indices", "end_header\n"]
+
+    with open(path, 'wb', buffering=_OBJ_WRITE_BUFFER_SIZE) as f:
+        f.write("\n".join(header).encode('ascii'))
+        vertex_block.tofile(f)
+        face_block.tofile(f)
+
+def _write_obj(path: str, mesh_name: str, vertices, indices, normals, uvs, face_count: int):
+    """
+    Writes a mesh as a Wavefront .obj file.
+    """
+    has_normals = len(normals) > 0
+    has_uvs = len(uvs) > 0
+    # Sections are formatted in large chunks straight into a 1 MB write buffer, instead of
+    # collecting one Python string per line and joining them. Writes stay synchronous: the
+    # output is queued for the archive as soon as the export returns, and meshes already export
+    # in parallel on the extraction pool, so one mesh's disk I/O overlaps another's formatting
+    # while the archive's single writer thread compresses earlier assets.
+    with open(path, 'w', encoding='utf-8', buffering=_OBJ_WRITE_BUFFER_SIZE) as f:
+        f.write(
+            "# Wavefront OBJ file exported by UnityBundleExtractor\n"
+            f"# Source Mesh: {mesh_name}\n"
+            f"# Vertices: {len(vertices)}\n"
+            f"# Faces: {face_count}\n"
+            "\n"
+        )
+        _write_rows(f, _vertex_array(vertices), f"v {_FLOAT_FMT} {_FLOAT_FMT} {_FLOAT_FMT}\n")
+
+        if has_normals:
+            f.write("\n")
+            _write_rows(f, _vertex_array(normals), f"vn {_FLOAT_FMT} {_FLOAT_FMT} {_FLOAT_FMT}\n")
+
+        if has_uvs:
+            f.write("\n")
+            _write_rows(f, _vertex_array(uvs, 2), f"vt {_FLOAT_FMT} {_FLOAT_FMT}\n")
+
+        if face_count:
+            f.write("\ng mesh\n")
+            # OBJ indices are 1-based; each vertex index is repeated once per referenced attribute.
+            # The face layout is chosen once here, never per triangle.
+            faces = np.asarray(indices, dtype=np.int64)[:face_count * 3].reshape(-1, 3) + 1
+            if has_normals and has_uvs:
+                _write_rows(f, np.repeat(faces, 3, axis=1), "f %d/%d/%d %d/%d/%d %d/%d/%d\n")
+            elif has_uvs:
+                _write_rows(f, np.repeat(faces, 2, axis=1), "f %d/%d %d/%d %d/%d\n")
+            elif has_normals:
+                _write_rows(f, np.repeat(faces, 2, axis=1), "f %d//%d %d//%d %d//%d\n")
+            else:
+                _write_rows(f, faces, "f %d %d %d\n")
+
+def export_mesh_obj(data: Any, output_path: str, debug_mode: bool, local_logger: logging.Logger, binary: bool = False,
+                    reader_lock: ContextManager = NO_LOCK) -> bool:
+    """
+    Exports a Mesh asset to a Wavefront .obj file, or a binary .ply file if requested.
+    Includes vertex, normal, and UV data if available. Also generates a metadata JSON file.
 
     Args:
         data (Any): The UnityPy object data for the mesh.
         output_path (str): The base path for the output file (without extension).
         debug_mode (bool): Flag indicating if the application is in debug mode.
         local_logger (logging.Logger): The logger instance for recording messages.
+        binary (bool): Write binary little-endian PLY instead of text OBJ. Raw float32 data
+                       is written without any number formatting, which is far faster for large meshes.
+        reader_lock (ContextManager): Guards the bundle's UnityPy readers; held while mesh data is loaded.
 
     Returns:
         bool: True if the mesh was successfully exported, False otherwise.
     """
     try:
         local_logger.debug(f"Attempting to export Mesh: {output_path}")
-        vertices = getattr(data, 'm_Vertices', [])
-        indices = getattr(data, 'm_IndexBuffer', [])
-        normals = getattr(data, 'm_Normals', [])
-        uvs = getattr(data, 'm_UV', [])
+        # Mesh data may be loaded lazily from the bundle, so it is fetched under the reader lock.
+        # Attributes may be missing, None, lists or arrays; normalize to something with a len()
+        with reader_lock:
+            vertices, indices, normals, uvs = (
+                _sized(getattr(data, name, None)) for name in ('m_Vertices', 'm_IndexBuffer', 'm_Normals', 'm_UV')
+            )
+            mesh_name = getattr(data, 'm_Name', 'Unknown')
         
-        if not vertices:
+        if not len(vertices):
             local_logger.debug(f"Mesh {output_path} has no vertices, skipping export.")
             return False
         
-        obj_lines = [
-            f"# Wavefront OBJ file exported by UnityBundleExtractor",
-            f"# Source Mesh: {getattr(data, 'm_Name', 'Unknown')}",
-            f"# Vertices: {len(vertices)}",
-            f"# Faces: {len(indices) // 3 if indices else 0}",
-            ""
-        ]
-        
-        # Write vertices
-        for v in vertices:
-            if len(v) >= 3:
-                obj_lines.append(f"v {v[0]} {v[1]} {v[2]}")
-        
-        # Write normals
-        if normals:
-            obj_lines.append("")
-            for n in normals:
-                if len(n) >= 3:
-                    obj_lines.append(f"vn {n[0]} {n[1]} {n[2]}")
-        
-        # Write UVs (texture coordinates)
-        if uvs:
-            obj_lines.append("")
-            for uv in uvs:
-                if len(uv) >= 2:
-                    obj_lines.append(f"vt {uv[0]} {uv[1]}")
-
-        # Write faces
-        if indices:
-            obj_lines.append("\ng mesh")
-            for i in range(0, len(indices) - 2, 3):
-                # OBJ indices are 1-based
-                v1, v2, v3 = indices[i] + 1, indices[i+1] + 1, indices[i+2] + 1
-                face_str = "f"
-                if normals and uvs:
-                    face_str += f" {v1}/{v1}/{v1} {v2}/{v2}/{v2} {v3}/{v3}/{v3}"
-                elif uvs:
-                    face_str += f" {v1}/{v1} {v2}/{v2} {v3}/{v3}"
-                elif normals:
-                    face_str += f" {v1}//{v1} {v2}//{v2} {v3}//{v3}"
-                else:
-                    face_str += f" {v1} {v2} {v3}"
-                obj_lines.append(face_str)
-
-        with open(f"{output_path}.obj", 'w', encoding='utf-8') as f:
-            f.write('\n'.join(obj_lines))
-        
+        has_normals = len(normals) > 0
+        has_uvs = len(uvs) > 0
+        face_count = len(indices) // 3
+
+        if binary:
+            vertex_arr = _vertex_array(vertices)
+            # PLY stores attributes per vertex, so only attribute arrays matching the vertex count are kept
+            normal_arr = _vertex_array(normals) if has_normals else None
+            uv_arr = _vertex_array(uvs, 2) if has_uvs else None
+            has_normals = normal_arr is not None and len(normal_arr) == len(vertex_arr)
+            has_uvs = uv_arr is not None and len(uv_arr) == len(vertex_arr)
+            faces = np.asarray(indices, dtype=np.int64)[:face_count * 3].reshape(-1, 3)
+            _write_ply(f"{output_path}.ply", vertex_arr, normal_arr if has_normals else None,
+                       uv_arr if has_uvs else None, faces)
+        else:
+            _write_obj(f"{output_path}.obj", mesh_name, vertices, indices, normals, uvs, face_count)
+
         # Save mesh metadata
         metadata = {
             'vertex_count': len(vertices),
-            'triangle_count': len(indices) // 3 if indices else 0,
-            'has_normals': bool(normals),
-            'has_uvs': bool(uvs),
+            'triangle_count': face_count,
+            'has_normals': has_normals,
+            'has_uvs': has_uvs,
             'bounds': _calculate_bounds(vertices)
         }
-        with open(f"{output_path}_meta.json", 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2)
+        write_bytes_file(f"{output_path}_meta.json", dump_json_bytes(metadata))
 
-        local_logger.debug(f"Mesh {output_path} saved as OBJ.")
+        local_logger.debug(f"Mesh {output_path} saved as {'PLY' if binary else 'OBJ'}.")
         return True
     except Exception as e:
         local_logger.error(f"OBJ export failed for {output_path}: {e}", exc_info=debug_mode)
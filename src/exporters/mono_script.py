@@ -7,15 +7,18 @@ License: MIT License
 This module provides a standalone function for exporting Unity MonoScript assets.
 """
 
-import json
 import logging
-from typing import Any
+from typing import Any, ContextManager
+
+from src.utils import NO_LOCK, write_bytes_file, dump_json_bytes
+
 from .generic import export_generic
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
-def export_mono_script(data: Any, output_path: str, debug_mode: bool, local_logger: logging.Logger) -> bool:
+def export_mono_script(data: Any, output_path: str, debug_mode: bool, local_logger: logging.Logger,
+                       reader_lock: ContextManager = NO_LOCK) -> bool:
     """
     Exports a MonoScript asset to a .cs file if its source code is available.
     If not, it falls back to a generic JSON export of its TypeTree.
@@ -25,6 +28,7 @@ def export_mono_script(data: Any, output_path: str, debug_mode: bool, local_logg
         output_path (str): The base path for the output file (without extension).
         debug_mode (bool): Flag indicating if the application is in debug mode.
         local_logger (logging.Logger): The logger instance for recording messages.
+        reader_lock (ContextManager): Guards the bundle's UnityPy readers; held while payloads are loaded.
 
     Returns:
         bool: True if the mono script was successfully exported, False otherwise.
@@ -33,25 +37,25 @@ def export_mono_script(data: Any, output_path: str, debug_mode: bool, local_logg
         local_logger.debug(f"Attempting to export MonoScript: {output_path}")
         # The actual C# source (m_Script) is often not embedded in bundles for MonoScript.
         # It's usually a reference.
-        script_content = getattr(data, 'm_Script', '')
+        with reader_lock:
+            script_content = getattr(data, 'm_Script', '')
+            metadata = {
+                'class_name': getattr(data, 'm_ClassName', ''),
+                'namespace': getattr(data, 'm_Namespace', ''),
+                'assembly_name': getattr(data, 'm_AssemblyName', '')
+            }
         if isinstance(script_content, bytes):
             script_content = ''
 
         if not script_content or not script_content.strip():
             # If source is not directly available, fall back to generic exporter
             local_logger.debug(f"MonoScript {output_path} has no script content, falling back to generic export.")
-            return export_generic(data, output_path, "MonoScript", debug_mode, local_logger)
+            return export_generic(data, output_path, "MonoScript", debug_mode, local_logger, reader_lock=reader_lock)
 
         with open(f"{output_path}.cs", 'w', encoding='utf-8') as f:
             f.write(script_content)
 
-        metadata = {
-                'class_name': getattr(data, 'm_ClassName', ''),
-                'namespace': getattr(data, 'm_Namespace', ''),
-                'assembly_name': getattr(data, 'm_AssemblyName', '')
-            }
-        with open(f"{output_path}_meta.json", 'w') as f:
-            json.dump(metadata, f, indent=2)
+        write_bytes_file(f"{output_path}_meta.json", dump_json_bytes(metadata))
         
         local_logger.debug(f"MonoScript {output_path} saved as .cs.")
         return True
@@ -7,9 +7,10 @@ License: MIT License
 This module provides a standalone function for exporting Unity Shader assets.
 """
 
-import json
 import logging
-from typing import Any
+from typing import Any, ContextManager
+
+from src.utils import NO_LOCK, write_bytes_file, dump_json_bytes
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
@@ -33,7 +34,8 @@ def _extract_shader_properties(data: Any) -> list:
         logger.warning(f"Failed to extract shader properties: {e}")
     return properties
     
-def export_shader(data: Any, output_path: str, debug_mode: bool, local_logger: logging.Logger) -> bool:
+def export_shader(data: Any, output_path: str, debug_mode: bool, local_logger: logging.Logger,
+                  reader_lock: ContextManager = NO_LOCK) -> bool:
     """
     Exports a Shader asset to a .shader source file. Also generates a metadata JSON.
 
@@ -42,13 +44,19 @@ def export_shader(data: Any, output_path: str, debug_mode: bool, local_logger: l
         output_path (str): The base path for the output file (without extension).
         debug_mode (bool): Flag indicating if the application is in debug mode.
         local_logger (logging.Logger): The logger instance for recording messages.
+        reader_lock (ContextManager): Guards the bundle's UnityPy readers; held while payloads are loaded.
 
     Returns:
         bool: True if the shader was successfully exported, False otherwise.
     """
     try:
         local_logger.debug(f"Attempting to export Shader: {output_path}")
-        shader_content = getattr(data, 'm_Script', '')
+        with reader_lock:
+            shader_content = getattr(data, 'm_Script', '')
+            metadata = {
+                'name': getattr(data, 'm_Name', 'Unknown'),
+                'properties': _extract_shader_properties(data)
+            }
         if not shader_content:
             local_logger.debug(f"Shader {output_path} has no script content, skipping.")
             return False
@@ -56,12 +64,7 @@ def export_shader(data: Any, output_path: str, debug_mode: bool, local_logger: l
         with open(f"{output_path}.shader", 'w', encoding='utf-8', errors='replace') as f:
             f.write(shader_content)
             
-        metadata = {
-            'name': getattr(data, 'm_Name', 'Unknown'),
-            'properties': _extract_shader_properties(data)
-        }
-        with open(f"{output_path}_meta.json", 'w') as f:
-            json.dump(metadata, f, indent=2)
+        write_bytes_file(f"{output_path}_meta.json", dump_json_bytes(metadata))
         
         local_logger.debug(f"Shader {output_path} saved.")
         return True
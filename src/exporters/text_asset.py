@@ -8,24 +8,45 @@ This module provides a standalone function for exporting Unity TextAsset objects
 """
 
 import os
+import re
 import json
 import logging
-from typing import Any
+from typing import Any, ContextManager, Union
+
+from src.utils import NO_LOCK
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
-def _detect_text_format(content: str) -> str:
+# First non-whitespace character, for raw bytes and decoded text
+_CONTENT_START_BYTES = re.compile(rb'\S')
+_CONTENT_START_STR = re.compile(r'\S')
+
+def _content_start(content: Union[bytes, str]) -> int:
+    """
+    Finds the offset of the first non-whitespace character without copying the content.
+    Returns -1 if the content is empty or whitespace only.
+    """
+    pattern = _CONTENT_START_BYTES if isinstance(content, bytes) else _CONTENT_START_STR
+    match = pattern.search(content)
+    return match.start() if match else -1
+
+def _detect_text_format(content: Union[bytes, str], start: int) -> str:
     """
     Detects if text content is likely JSON, XML, or YAML based on its structure.
+    Works on raw bytes as well as decoded text, looking only at the content from `start` on.
     """
-    content_stripped = content.strip()
-    if content_stripped.startswith(('{', '[')): return '.json'
-    if content_stripped.startswith('<?xml'): return '.xml'
-    if content_stripped.startswith('---'): return '.yaml'
+    if isinstance(content, bytes):
+        json_starts, xml_start, yaml_start = (b'{', b'['), b'<?xml', b'---'
+    else:
+        json_starts, xml_start, yaml_start = ('{', '['), '<?xml', '---'
+    if content.startswith(json_starts, start): return '.json'
+    if content.startswith(xml_start, start): return '.xml'
+    if content.startswith(yaml_start, start): return '.yaml'
     return '.txt'
 
-def export_text_asset(data: Any, output_path: str, debug_mode: bool, local_logger: logging.Logger) -> bool:
+def export_text_asset(data: Any, output_path: str, debug_mode: bool, local_logger: logging.Logger,
+                      reader_lock: ContextManager = NO_LOCK) -> bool:
     """
     Exports a TextAsset to a file, attempting to detect its format (JSON, XML, YAML, or plain text).
 
@@ -34,25 +55,28 @@ def export_text_asset(data: Any, output_path: str, debug_mode: bool, local_logge
         output_path (str): The base path for the output file (without extension).
         debug_mode (bool): Flag indicating if the application is in debug mode.
         local_logger (logging.Logger): The logger instance for recording messages.
+        reader_lock (ContextManager): Guards the bundle's UnityPy readers; held while payloads are loaded.
 
     Returns:
         bool: True if the text asset was successfully exported, False otherwise.
     """
     try:
         local_logger.debug(f"Attempting to export TextAsset: {output_path}")
-        if not hasattr(data, 'm_Script'):
+        with reader_lock:
+            content = getattr(data, 'm_Script', None)
+        if content is None:
             local_logger.debug(f"TextAsset {output_path} has no script content, skipping.")
             return False
         
-        content = data.m_Script
-        if isinstance(content, bytes):
-            content = content.decode('utf-8', errors='replace')
-        
-        if not content.strip(): 
+        # Detection runs on the raw payload; it is only decoded for the final write
+        start = _content_start(content)
+        if start < 0:
             local_logger.debug(f"TextAsset {output_path} has empty content, skipping.")
             return False
         
-        ext = _detect_text_format(content)
+        ext = _detect_text_format(content, start)
+        if isinstance(content, bytes):
+            content = content.decode('utf-8', errors='replace')
         
         with open(f"{output_path}{ext}", 'w', encoding='utf-8') as f:
             f.write(content)
@@ -7,22 +7,24 @@ License: MIT License
 This module provides a standalone function for exporting Unity Texture2D and Sprite assets.
 """
 
-import json
 import os
 import logging
 import io
-from typing import Any
+from typing import Any, ContextManager, Dict, List, Optional
 
+import numpy as np
 from PIL import Image
 
+from src.utils import NO_LOCK, write_bytes_file, dump_json_bytes
+
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
-def _save_texture_metadata(data: Any, output_path: str, exported_format: str, local_logger: logging.Logger):
+def _texture_metadata(data: Any, exported_format: str) -> Dict[str, Any]:
     """
-    Saves a JSON metadata file for an exported texture.
+    Builds the metadata record for an exported texture.
     """
-    metadata = {
+    return {
         'width': getattr(data, 'm_Width', 'Unknown'),
         'height': getattr(data, 'm_Height', 'Unknown'),
         'format_unity': str(getattr(data, 'm_Format', 'Unknown')),
@@ -32,14 +34,74 @@ def _save_texture_metadata(data: Any, output_path: str, exported_format: str, lo
         'mip_count': getattr(data, 'm_MipCount', 1),
         'readable': getattr(data, 'm_IsReadable', False)
     }
+
+def _save_texture_metadata(data: Any, output_path: str, exported_format: str, local_logger: logging.Logger,
+                           metadata_sink: Optional[List[Dict[str, Any]]] = None):
+    """
+    Saves the metadata for an exported texture, either as its own JSON file or,
+    when a sink is given, as a record appended to it for the caller to write in bulk.
+    Records in a sink carry the exported asset's path relative to the output directory, without extension.
+    """
+    metadata = _texture_metadata(data, exported_format)
+    if metadata_sink is not None:
+        type_dir, base_name = os.path.split(output_path)
+        metadata['asset'] = f"{os.path.basename(type_dir)}/{base_name}"
+        metadata_sink.append(metadata)
+        return
     try:
-        with open(f"{output_path}_meta.json", 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2)
+        write_bytes_file(f"{output_path}_meta.json", dump_json_bytes(metadata))
         local_logger.debug(f"Saved metadata for texture: {output_path}")
     except Exception as e:
         local_logger.warning(f"Failed to save metadata for {output_path}: {e}")
 
-def export_texture(data: Any, output_path: str, debug_mode: bool, local_logger: logging.Logger) -> bool:
+# Unity texture formats (TextureFormat names) that carry no alpha channel.
+# Textures in these formats are opaque by definition, so their pixels are never scanned.
+_OPAQUE_UNITY_FORMATS = frozenset({
+    'RGB24', 'RGB565', 'R8', 'R16', 'RG16', 'RG32', 'RGB48',
+    'RHalf', 'RGHalf', 'RFloat', 'RGFloat', 'RGB9e5Float', 'YUY2',
+    'DXT1', 'DXT1Crunched', 'BC4', 'BC5', 'BC6H',
+    'ETC_RGB4', 'ETC_RGB4_3DS', 'ETC_RGB4Crunched', 'ETC2_RGB',
+    'EAC_R', 'EAC_R_SIGNED', 'EAC_RG', 'EAC_RG_SIGNED',
+    'PVRTC_RGB2', 'PVRTC_RGB4', 'ATC_RGB4'
+})
+
+def _texture_format_name(data: Any) -> str:
+    """Returns the name of a texture's Unity TextureFormat, or '' if it has none."""
+    texture_format = getattr(data, 'm_TextureFormat', None)
+    if texture_format is None:
+        return ''
+    return getattr(texture_format, 'name', None) or str(texture_format)
+
+def _is_opaque(img: Image.Image, texture_format: str = '') -> bool:
+    """
+    Checks whether an image has no transparent pixels, i.e. can be saved as JPG.
+    Known alpha-less source formats answer this without looking at the pixels;
+    otherwise only the alpha band of RGBA images is scanned, with a single NumPy min reduction.
+    """
+    if img.mode in ('RGB', 'L') or texture_format in _OPAQUE_UNITY_FORMATS:
+        return True
+    if img.mode == 'RGBA':
+        return np.asarray(img.getchannel('A')).min() == 255
+    return False
+
+def _encode_image(img: Image.Image, image_format: str, **params: Any) -> io.BytesIO:
+    """
+    Encodes an image into an in-memory buffer.
+
+    Args:
+        img (Image.Image): The image to encode.
+        image_format (str): The PIL format name (e.g., 'PNG', 'JPEG').
+        **params: Encoder options passed to `Image.save`.
+
+    Returns:
+        io.BytesIO: The buffer holding the encoded file.
+    """
+    buffer = io.BytesIO()
+    img.save(buffer, format=image_format, **params)
+    return buffer
+
+def export_texture(data: Any, output_path: str, debug_mode: bool, local_logger: logging.Logger,
+                   metadata_sink: Optional[List[Dict[str, Any]]] = None, reader_lock: ContextManager = NO_LOCK) -> bool:
     """
     Exports a Texture2D or Sprite asset to an image file (PNG or JPG).
     Prioritizes JPG for non-transparent images to save space, falls back to PNG.
@@ -49,6 +111,9 @@ def export_texture(data: Any, output_path: str, debug_mode: bool, local_logger:
         output_path (str): The base path for the output file (without extension).
         debug_mode (bool): Flag indicating if the application is in debug mode.
         local_logger (logging.Logger): The logger instance for recording messages.
+        metadata_sink (Optional[List[Dict[str, Any]]]): If given, metadata records are appended to
+                                                        this list instead of written as `_meta.json` files.
+        reader_lock (ContextManager): Guards the bundle's UnityPy readers; held while payloads are loaded.
 
     Returns:
         bool: True if the texture was successfully exported, False otherwise.
@@ -56,37 +121,40 @@ def export_texture(data: Any, output_path: str, debug_mode: bool, local_logger:
     try:
         local_logger.debug(f"Attempting to export Texture2D/Sprite: {output_path}")
         
-        if hasattr(data, 'image') and data.image:
-            img = data.image
-            exported_format_ext = 'png'
-            
-            if img.mode in ('RGB', 'L') or (img.mode == 'RGBA' and img.getextrema()[3][0] == 255):
+        # Decode the image, or fetch a raw payload, under the reader lock; encoding and writes run unlocked
+        with reader_lock:
+            img = getattr(data, 'image', None)
+            stream_data = None if img else getattr(data, 'm_StreamData', None)
+            image_data = None if img or stream_data else getattr(data, 'image_data', None)
+
+        if img:
+            # Pick the format from the pixels once, then encode exactly once in memory; the file is
+            # only created after encoding succeeded, so failures leave no partial image behind
+            exported_format_ext = 'jpg' if _is_opaque(img, _texture_format_name(data)) else 'png'
+            if exported_format_ext == 'jpg':
                 try:
-                    output_file_jpg = f"{output_path}.jpg"
-                    img.save(output_file_jpg, optimize=True, quality=90)
-                    _save_texture_metadata(data, output_path, 'jpg', local_logger)
-                    local_logger.debug(f"Texture {output_path} saved as JPG.")
-                    return True
+                    # JPEG has no alpha channel; fully opaque RGBA is saved as RGB
+                    encoded = _encode_image(img if img.mode != 'RGBA' else img.convert('RGB'), 'JPEG', optimize=True, quality=90)
                 except Exception as jpg_e:
                     local_logger.warning(f"Failed to save {output_path} as JPG, falling back to PNG. Error: {jpg_e}", exc_info=debug_mode)
-            
-            output_file_png = f"{output_path}.png"
-            img.save(output_file_png, optimize=True)
-            _save_texture_metadata(data, output_path, exported_format_ext, local_logger)
-            local_logger.debug(f"Texture {output_path} saved as PNG.")
+                    exported_format_ext = 'png'
+            if exported_format_ext == 'png':
+                encoded = _encode_image(img, 'PNG', optimize=True)
+
+            write_bytes_file(f"{output_path}.{exported_format_ext}", encoded.getbuffer())
+            _save_texture_metadata(data, output_path, exported_format_ext, local_logger, metadata_sink)
+            local_logger.debug(f"Texture {output_path} saved as {exported_format_ext.upper()}.")
             return True
 
-        elif hasattr(data, 'm_StreamData') and data.m_StreamData:
-            with open(f"{output_path}.raw", 'wb') as f:
-                f.write(data.m_StreamData)
-            _save_texture_metadata(data, output_path, 'raw_stream', local_logger)
+        elif stream_data:
+            write_bytes_file(f"{output_path}.raw", stream_data)
+            _save_texture_metadata(data, output_path, 'raw_stream', local_logger, metadata_sink)
             local_logger.warning(f"Texture for {output_path} saved as raw stream. Associated .resS file might be missing.")
             return True
 
-        elif hasattr(data, 'image_data') and data.image_data:
-            with open(f"{output_path}.raw_imgdata", 'wb') as f:
-                f.write(data.image_data)
-            _save_texture_metadata(data, output_path, 'raw_imagedata', local_logger)
+        elif image_data:
+            write_bytes_file(f"{output_path}.raw_imgdata", image_data)
+            _save_texture_metadata(data, output_path, 'raw_imagedata', local_logger, metadata_sink)
             local_logger.warning(f"Texture for {output_path} saved as raw image data. Associated .resS file might be missing.")
             return True
         
@@ -10,7 +10,10 @@ This module provides a standalone function for exporting Unity VideoClip or Movi
 import os
 import json
 import logging
-from typing import Any
+from typing import Any, ContextManager
+
+from src.utils import NO_LOCK, write_bytes_file
+from ._magic import detect, MAGIC_VIDEO
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
@@ -18,16 +21,13 @@ logger = logging.getLogger(__name__)
 def _detect_video_format(video_data: bytes) -> str:
     """
     Detects common video file formats from their binary data headers.
+    Signatures are matched in place, so no part of the (often very large) payload is copied.
     """
     if len(video_data) < 8: return '.video'
-    header = video_data[:8]
-    if header[4:8] == b'ftyp': return '.mp4'
-    if header[:4] == b'RIFF' and len(video_data) >= 12 and video_data[8:12] == b'WAVE': return '.wav'
-    if header[:3] == b'FLV': return '.flv'
-    if header[:2] == b'\x1a\x45': return '.mkv'
-    return '.mov'
+    return f".{detect(video_data, MAGIC_VIDEO, 'mov')}"
         
-def export_video(data: Any, output_path: str, debug_mode: bool, local_logger: logging.Logger) -> bool:
+def export_video(data: Any, output_path: str, debug_mode: bool, local_logger: logging.Logger,
+                 reader_lock: ContextManager = NO_LOCK) -> bool:
     """
     Exports a VideoClip or MovieTexture asset to a video file.
     Attempts to detect the video format based on its header.
@@ -37,20 +37,22 @@ def export_video(data: Any, output_path: str, debug_mode: bool, local_logger: lo
         output_path (str): The base path for the output file (without extension).
         debug_mode (bool): Flag indicating if the application is in debug mode.
         local_logger (logging.Logger): The logger instance for recording messages.
+        reader_lock (ContextManager): Guards the bundle's UnityPy readers; held while payloads are loaded.
 
     Returns:
         bool: True if the video clip was successfully exported, False otherwise.
     """
     try:
         local_logger.debug(f"Attempting to export VideoClip: {output_path}")
-        video_data = getattr(data, 'm_MovieData', None)
+        with reader_lock:
+            video_data = getattr(data, 'm_MovieData', None)
         if not video_data:
             local_logger.debug(f"VideoClip {output_path} has no video data, skipping.")
             return False
         
         ext = _detect_video_format(video_data)
-        with open(f"{output_path}{ext}", 'wb') as f:
-            f.write(video_data)
+        # Video payloads can be hundreds of MB; write them straight to the fd without a buffer copy
+        write_bytes_file(f"{output_path}{ext}", video_data)
 
         local_logger.debug(f"VideoClip {output_path} saved as {ext}.")
         return True
@@ -6,20 +6,59 @@ License: MIT License
 
 This module implements the central task queue for asynchronous processing
 of Unity asset bundles. Tasks (session IDs) are added here and consumed by workers.
-It uses collections.deque for efficient task management and position lookup.
+The FIFO itself is a queue.SimpleQueue; every task also gets a sequence number,
+kept in a dict index, so queue positions are computed without scanning the queue.
 """
 
-from collections import deque
+import bisect
 import logging
+import queue
 import threading
+import time
+from typing import Dict, List, Optional
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
-# The global task queue instance
-processing_task_queue = deque()
-# A lock to protect access to the deque from multiple threads (API route, workers)
-queue_lock = threading.Lock() 
+# The global task queue instance, holding (sequence number, session ID) pairs in FIFO order
+processing_task_queue = queue.SimpleQueue()
+# Sequence number of every pending session. A queued pair whose session is missing here,
+# or maps to another number, is a tombstone left by a cancellation and is skipped by consumers.
+_pending_index: Dict[str, int] = {}
+# Sorted sequence numbers of the tombstones still in the queue, so positions can discount them
+_cancelled_seqs: List[int] = []
+# Sequence number handed to the next task added, and the one expected at the head of the queue
+_next_seq = 0
+_head_seq = 0
+# Returned by `get_task_from_queue` to the consumer that takes a stop signal off the queue
+STOP_SIGNAL = object()
+
+# A lock protecting the index and counters. Sequence numbers are assigned and queued under it,
+# so queue order always matches sequence order.
+queue_lock = threading.Lock()
+
+def _cancel_pending_locked(session_id: str) -> Optional[int]:
+    """
+    Drops a session from the pending index, turning its queued entry into a tombstone.
+    The caller must hold `queue_lock`.
+
+    Returns:
+        Optional[int]: The sequence number of the removed entry, or None if it was not pending.
+    """
+    seq = _pending_index.pop(session_id, None)
+    if seq is not None:
+        bisect.insort(_cancelled_seqs, seq)
+    return seq
+
+def _enqueue_locked(session_id: str):
+    """Appends a session to the queue. The caller must hold `queue_lock`."""
+    global _next_seq
+    # A session is queued at most once; re-adding it moves it to the back
+    _cancel_pending_locked(session_id)
+    seq = _next_seq
+    _next_seq += 1
+    _pending_index[session_id] = seq
+    processing_task_queue.put((seq, session_id))
 
 def add_task_to_queue(session_id: str):
     """
@@ -29,22 +68,62 @@ def add_task_to_queue(session_id: str):
         session_id (str): The unique identifier of the session to be processed.
     """
     with queue_lock:
-        processing_task_queue.append(session_id)
-        logger.info(f"Session {session_id} added to the processing queue. Current queue size: {len(processing_task_queue)}")
+        _enqueue_locked(session_id)
+        logger.info(f"Session {session_id} added to the processing queue. Current queue size: {len(_pending_index)}")
 
-def get_task_from_queue() -> str:
+def get_task_from_queue(block: bool = False, timeout: Optional[float] = None) -> str:
     """
-    Retrieves a session ID from the processing queue. This call is non-blocking.
+    Retrieves a session ID from the processing queue. Entries of cancelled sessions
+    are discarded along the way.
+
+    Args:
+        block (bool): Wait for a task instead of returning immediately when the queue is empty.
+        timeout (Optional[float]): With `block`, the maximum number of seconds to wait;
+                                   None waits until a task or a stop signal arrives.
 
     Returns:
-        str: The session ID retrieved from the queue, or None if the queue is empty.
+        str: The session ID retrieved from the queue, `STOP_SIGNAL` if a stop signal was taken,
+             or None if no task arrived in time.
     """
-    with queue_lock:
-        if not processing_task_queue:
+    global _head_seq
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        try:
+            if not block:
+                item = processing_task_queue.get_nowait()
+            elif deadline is None:
+                # The waiting thread is parked until a producer puts a task, instead of polling
+                item = processing_task_queue.get()
+            else:
+                item = processing_task_queue.get(timeout=max(deadline - time.monotonic(), 0))
+        except queue.Empty:
             return None
-        session_id = processing_task_queue.popleft()
-        logger.info(f"Session {session_id} retrieved from queue for processing. Remaining queue size: {len(processing_task_queue)}")
-        return session_id
+        if item is STOP_SIGNAL:
+            return STOP_SIGNAL
+        seq, session_id = item
+
+        with queue_lock:
+            # Consumers may record their entries slightly out of order; the head only moves forward
+            _head_seq = max(_head_seq, seq + 1)
+            if _pending_index.get(session_id) != seq:
+                i = bisect.bisect_left(_cancelled_seqs, seq)
+                if i < len(_cancelled_seqs) and _cancelled_seqs[i] == seq:
+                    del _cancelled_seqs[i]
+                continue
+            del _pending_index[session_id]
+            logger.info(f"Session {session_id} retrieved from queue for processing. Remaining queue size: {len(_pending_index)}")
+            return session_id
+
+def add_stop_signals(count: int):
+    """
+    Queues stop signals (poison pills) that wake blocked consumers, one consumer per signal.
+    Signals carry no sequence number, so queue positions are unaffected.
+
+    Args:
+        count (int): The number of stop signals, normally one per consumer thread.
+    """
+    for _ in range(count):
+        processing_task_queue.put(STOP_SIGNAL)
 
 def get_queue_size() -> int:
     """
@@ -53,8 +132,7 @@ def get_queue_size() -> int:
     Returns:
         int: The number of items in the queue.
     """
-    with queue_lock:
-        return len(processing_task_queue)
+    return len(_pending_index)
 
 def get_task_position(session_id: str) -> int:
     """
@@ -67,14 +145,17 @@ def get_task_position(session_id: str) -> int:
         int: The 1-based position, or -1 if the session is not found in the queue (e.g., already processed).
     """
     with queue_lock:
-        try:
-            return processing_task_queue.index(session_id) + 1
-        except ValueError:
+        seq = _pending_index.get(session_id)
+        if seq is None:
             return -1 # Session not found in queue
+        # Entries ahead of this one, minus the cancelled ones among them
+        ahead = seq - _head_seq - bisect.bisect_left(_cancelled_seqs, seq)
+        return max(ahead, 0) + 1
 
 def cancel_task_in_queue(session_id: str) -> bool:
     """
     Removes a specific session from the queue if it is pending.
+    Its queued entry stays behind as a tombstone that consumers skip.
 
     Args:
         session_id (str): The ID of the session to cancel.
@@ -83,10 +164,8 @@ def cancel_task_in_queue(session_id: str) -> bool:
         bool: True if the task was found and removed, False otherwise.
     """
     with queue_lock:
-        try:
-            processing_task_queue.remove(session_id)
-            logger.info(f"Session {session_id} cancelled and removed from queue. Current queue size: {len(processing_task_queue)}")
+        if _cancel_pending_locked(session_id) is not None:
+            logger.info(f"Session {session_id} cancelled and removed from queue. Current queue size: {len(_pending_index)}")
             return True
-        except ValueError:
-            logger.debug(f"Attempted to cancel session {session_id}, but it was not found in the queue.")
-            return False
\ No newline at end of file
+        logger.debug(f"Attempted to cancel session {session_id}, but it was not found in the queue.")
+        return False
@@ -10,27 +10,32 @@ tasks (bundle analysis/extraction) from the global task queue.
 
 import threading
 import logging
-import time
 
-from flask import Flask, current_app
-from .task_queue import get_task_from_queue, get_queue_size
+from flask import Flask
+from .task_queue import get_task_from_queue, add_stop_signals, STOP_SIGNAL
 from src.session.manager import get_session_data, update_session_status
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
+# How long `stop_workers` waits for each worker to finish its current task
+_STOP_JOIN_TIMEOUT = 1.0
+
 class WorkerPool:
     """
     Manages a pool of background worker threads. Each worker continuously
     fetches tasks from the shared task queue and processes them.
+    All workers deliberately share one FIFO: the queue position shown to users and
+    cancellation of pending sessions are defined against that single order, and each
+    task runs for seconds to minutes, so taking one from the queue is never a bottleneck.
     """
     def __init__(self, app: Flask, num_workers: int = 2):
         """
         Initializes the WorkerPool.
 
         Args:
-            app (Flask): The Flask application instance. This is needed to push
-                         application context to worker threads.
+            app (Flask): The Flask application instance. Workers don't need its application
+                         context: processors hold a reference to the app's config.
             num_workers (int): The number of worker threads to create.
         """
         self.app = app
@@ -43,6 +48,8 @@ class WorkerPool:
         """
         Starts the worker threads. Each worker is a daemon thread, meaning it will
         exit automatically when the main application thread exits.
+        Workers are threads rather than processes: the loaded UnityPy environment has to
+        stay in this process, where status polling, asset selection and extraction reach it.
         """
         for i in range(self.num_workers):
             worker_thread = threading.Thread(target=self._worker_task, args=(i,), daemon=True, name=f"BundleWorker-{i}")
@@ -56,62 +63,58 @@ class WorkerPool:
         The main task executed by each worker thread.
         It continuously pulls session IDs from the queue and processes them.
         """
-        with self.app.app_context():
-            logger.info(f"Worker {worker_id} started listening for tasks.")
-            while self.is_running:
-                session_id = None
-                try:
-                    # Polling the queue, as deque.popleft() is not blocking
-                    if get_queue_size() > 0:
-                        session_id = get_task_from_queue()
+        logger.info(f"Worker {worker_id} started listening for tasks.")
+        while self.is_running:
+            session_id = None
+            try:
+                # Blocks until a task or a stop signal arrives
+                session_id = get_task_from_queue(block=True)
+                if session_id is STOP_SIGNAL:
+                    session_id = None
+                    break
+                
+                if session_id:
+                    logger.info(f"Worker {worker_id} picked up task for session {session_id}.")
                     
-                    if session_id:
-                        logger.info(f"Worker {worker_id} picked up task for session {session_id}.")
-                        
-                        session_data = get_session_data(session_id)
-                        if not session_data or 'processor' not in session_data:
-                            logger.warning(f"Worker {worker_id}: Session data for {session_id} not found or incomplete. Skipping task.")
-                            continue
+                    session_data = get_session_data(session_id)
+                    if not session_data or 'processor' not in session_data:
+                        logger.warning(f"Worker {worker_id}: Session data for {session_id} not found or incomplete. Skipping task.")
+                        continue
 
-                        processor = session_data['processor']
-                        
-                        # Check if the task was already marked as cancelled before starting full processing
-                        if processor._is_cancelled:
-                            logger.info(f"Worker {worker_id}: Session {session_id} was already marked as cancelled. Skipping processing.")
-                            processor.processing_status = "cancelled"
-                            processor.error_message = "Task skipped: cancelled before processing started."
-                            processor.cleanup() # Ensure cleanup for skipped task
-                            continue
+                    processor = session_data['processor']
+                    
+                    # Check if the task was already marked as cancelled before starting full processing
+                    if processor.is_cancelled():
+                        logger.info(f"Worker {worker_id}: Session {session_id} was already marked as cancelled. Skipping processing.")
+                        processor.processing_status = "cancelled"
+                        processor.error_message = "Task skipped: cancelled before processing started."
+                        processor.cleanup() # Ensure cleanup for skipped task
+                        continue
 
-                        # Call the analysis method, which internally handles status updates and cancellation checks
-                        processor.analyze_bundle()
-                        
-                        logger.info(f"Worker {worker_id} finished processing for session {session_id}. Final Status: {processor.processing_status}")
-                        
+                    # Call the analysis method, which internally handles status updates and cancellation checks
+                    processor.analyze_bundle()
+                    
+                    logger.info(f"Worker {worker_id} finished processing for session {session_id}. Final Status: {processor.processing_status}")
+                    
+            except InterruptedError: # Caught if processor itself raises InterruptedError on cancellation
+                logger.info(f"Worker {worker_id}: Session {session_id} processing interrupted by cancellation.")
+                # Processor already updated its status and cleaned up
+            except Exception as e:
+                logger.error(f"Worker {worker_id} encountered an error processing session {session_id or 'unknown'}: {e}", exc_info=True)
+                if session_id:
+                    session_data = get_session_data(session_id)
+                    if session_data and 'processor' in session_data:
+                        processor = session_data['processor']
+                        if processor.processing_status not in ["cancelled", "error"]: # Avoid overwriting explicit cancellation
+                            processor.processing_status = "error"
+                            processor.error_message = f"Worker processing error: {str(e)}"
+                            update_session_status(session_id, 'processing_status', 'error')
+                            update_session_status(session_id, 'error_message', processor.error_message)
                     else:
-                        # If queue is empty, wait for a short period before checking again
-                        time.sleep(0.5)
-                        
-                except InterruptedError: # Caught if processor itself raises InterruptedError on cancellation
-                    logger.info(f"Worker {worker_id}: Session {session_id} processing interrupted by cancellation.")
-                    # Processor already updated its status and cleaned up
-                except Exception as e:
-                    logger.error(f"Worker {worker_id} encountered an error processing session {session_id or 'unknown'}: {e}", exc_info=True)
-                    if session_id:
-                        session_data = get_session_data(session_id)
-                        if session_data and 'processor' in session_data:
-                            processor = session_data['processor']
-                            if processor.processing_status not in ["cancelled", "error"]: # Avoid overwriting explicit cancellation
-                                processor.processing_status = "error"
-                                processor.error_message = f"Worker processing error: {str(e)}"
-                                update_session_status(session_id, 'processing_status', 'error')
-                                update_session_status(session_id, 'error_message', processor.error_message)
-                        else:
-                            logger.critical(f"Worker {worker_id}: Could not update status for session {session_id} due to missing session data after error.")
-                finally:
-                    # In a deque based queue, task_done() is not used.
-                    # The task is considered done once it's popped from the queue.
-                    pass
+                        logger.critical(f"Worker {worker_id}: Could not update status for session {session_id} due to missing session data after error.")
+            finally:
+                # SimpleQueue has no task_done(); a task is considered done once it's taken from the queue.
+                pass
 
     def stop_workers(self):
         """
@@ -119,8 +122,10 @@ class WorkerPool:
         This is typically called during graceful application shutdown.
         """
         self.is_running = False
+        # Idle workers are blocked on the queue; one poison pill wakes each of them right away
+        add_stop_signals(len(self.workers))
         for worker_thread in self.workers:
-            worker_thread.join(timeout=1.0)
+            worker_thread.join(timeout=_STOP_JOIN_TIMEOUT)
             if worker_thread.is_alive():
                 logger.warning(f"Worker thread {worker_thread.name} did not terminate gracefully.")
         logger.info("Worker pool stopped.")
\ No newline at end of file
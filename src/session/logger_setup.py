@@ -4,18 +4,84 @@ UnityBundleExtractor - Session Logger Setup Module
 Author: lenzarchive (https://github.com/lenzarchive)
 License: MIT License
 
-This module provides a standalone function to set up a dedicated logger
-for individual processing sessions.
+This module provides standalone functions to set up and tear down a dedicated
+logger for individual processing sessions. Session loggers only enqueue their
+records; a single listener thread formats them and writes the session log files,
+keeping file I/O off the worker and export threads.
 """
 
 import os
+import queue
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import threading
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from typing import Dict
+
+# How long `close_session_logger` waits for the listener to flush a session's records
+_CLOSE_TIMEOUT = 5.0
+
+class _LazyRotatingFileHandler(RotatingFileHandler):
+    """
+    A RotatingFileHandler that opens its file, creating the file's directory first,
+    only when the first record is written. Sessions that never log leave nothing on disk.
+    """
+    def __init__(self, filename: str, **kwargs):
+        super().__init__(filename, delay=True, **kwargs)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+class _SessionFileRouter(logging.Handler):
+    """
+    Hands each queued record to the file handler of the session logger it came from.
+    Runs only on the listener thread.
+    """
+    def __init__(self):
+        super().__init__()
+        self._handlers: Dict[str, logging.Handler] = {}
+
+    def register(self, logger_name: str, handler: logging.Handler):
+        """Routes records of a session logger to its file handler."""
+        self._handlers[logger_name] = handler
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        close_event = getattr(record, 'close_event', None)
+        if close_event is not None:
+            # Every record of the session queued before this marker has been written
+            handler = self._handlers.pop(record.name, None)
+            if handler is not None:
+                handler.close()
+            close_event.set()
+            return True
+        handler = self._handlers.get(record.name)
+        if handler is not None and record.levelno >= handler.level:
+            handler.handle(record)
+        return True
+
+    def emit(self, record: logging.LogRecord):
+        self.handle(record)
+
+_log_queue = queue.SimpleQueue()
+_router = _SessionFileRouter()
+_listener = None
+_listener_lock = threading.Lock()
+
+def _ensure_listener():
+    """Starts the listener thread on first use and stops it (flushing the queue) at exit."""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = QueueListener(_log_queue, _router)
+            _listener.start()
+            atexit.register(_listener.stop)
 
 def setup_session_logger(session_id: str, base_log_dir: str, log_level: str) -> logging.Logger:
     """
     Creates and configures a dedicated logger for a specific session.
     This allows for detailed, session-specific logging without cluttering the global log.
+    Calling it again for a session that already has its logger returns that logger unchanged.
 
     Args:
         session_id (str): The unique identifier for the session.
@@ -25,22 +91,43 @@ def setup_session_logger(session_id: str, base_log_dir: str, log_level: str) ->
     Returns:
         logging.Logger: The configured logger instance for the session.
     """
-    session_log_dir = os.path.join(base_log_dir, session_id)
-    os.makedirs(session_log_dir, exist_ok=True)
-    
     session_logger = logging.getLogger(f"session.{session_id}")
+    # Loggers are cached by name; a repeated setup must not stack another file handler
+    if session_logger.handlers:
+        return session_logger
     session_logger.propagate = False
-    
-    handler = RotatingFileHandler(
-        os.path.join(session_log_dir, f"{session_id}.log"),
+
+    # Neither the session's log directory nor its file exist until the first record is written
+    handler = _LazyRotatingFileHandler(
+        os.path.join(base_log_dir, session_id, f"{session_id}.log"),
         maxBytes=2 * 1024 * 1024,  # 2 MB per file
         backupCount=1
     )
     handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
     handler.setLevel(getattr(logging, log_level))
-    
-    session_logger.addHandler(handler)
+
+    # The file handler is driven by the listener thread; the logger itself only enqueues
+    _ensure_listener()
+    _router.register(session_logger.name, handler)
+    session_logger.addHandler(QueueHandler(_log_queue))
     session_logger.setLevel(getattr(logging, log_level))
-    
-    session_logger.info(f"Session logger initialized for session ID: {session_id}")
-    return session_logger
\ No newline at end of file
+    return session_logger
+
+def close_session_logger(session_logger: logging.Logger):
+    """
+    Detaches a session logger and closes its log file once all of its queued
+    records have been written. Blocks until the file is closed, so the session's
+    log directory can be deleted afterwards.
+
+    Args:
+        session_logger (logging.Logger): The logger returned by `setup_session_logger`.
+    """
+    for handler in session_logger.handlers[:]:
+        session_logger.removeHandler(handler)
+        handler.close()
+
+    if _listener is None:
+        return
+    close_event = threading.Event()
+    _log_queue.put(logging.makeLogRecord({'name': session_logger.name, 'close_event': close_event}))
+    close_event.wait(_CLOSE_TIMEOUT)
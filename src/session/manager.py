@@ -10,32 +10,105 @@ ensuring thread-safe access to session data.
 
 import threading
 import logging
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
 
 logger = logging.getLogger(__name__)
 
-# Global dictionary to hold data for active processing sessions.
-# Keys are session IDs, values are dictionaries containing BundleProcessor instances and metadata.
-processing_sessions: Dict[str, Dict[str, Any]] = {}
+# Number of independently locked partitions of the session store (a power of two)
+SESSION_SHARDS = 16
 
-# A lock to ensure thread-safe access to the `processing_sessions` dictionary
-session_lock = threading.Lock()
+class ShardedSessionStore:
+    """
+    A session ID -> session data map split into shards, each guarded by its own lock.
+    Request threads polling status and workers updating sessions only contend
+    when their sessions hash to the same shard.
+    """
+    def __init__(self, num_shards: int = SESSION_SHARDS):
+        """
+        Initializes the empty store.
+
+        Args:
+            num_shards (int): The number of shards; must be a power of two.
+        """
+        self._mask = num_shards - 1
+        self._shards = [({}, threading.Lock()) for _ in range(num_shards)]
+
+    def _shard(self, session_id: str) -> Tuple[Dict[str, Dict[str, Any]], threading.Lock]:
+        """Returns the (dictionary, lock) pair holding a session."""
+        return self._shards[hash(session_id) & self._mask]
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Returns a session's data, or None if it doesn't exist."""
+        sessions, lock = self._shard(session_id)
+        with lock:
+            return sessions.get(session_id)
+
+    def add(self, session_id: str, session_data: Dict[str, Any]):
+        """Stores a session's data, replacing any existing entry."""
+        sessions, lock = self._shard(session_id)
+        with lock:
+            sessions[session_id] = session_data
+
+    def update(self, session_id: str, key: str, value: Any) -> bool:
+        """Sets one key of a session's data. Returns False if the session doesn't exist."""
+        sessions, lock = self._shard(session_id)
+        with lock:
+            session_data = sessions.get(session_id)
+            if session_data is None:
+                return False
+            session_data[key] = value
+            return True
+
+    def remove(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Removes a session and returns its data, or None if it didn't exist."""
+        sessions, lock = self._shard(session_id)
+        with lock:
+            return sessions.pop(session_id, None)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns a shallow copy of all sessions. Each shard is locked only while it is
+        copied, so the result is consistent per shard rather than globally.
+        """
+        result = {}
+        for sessions, lock in self._shards:
+            with lock:
+                result.update(sessions)
+        return result
+
+    def created_times(self) -> List[Tuple[str, float]]:
+        """
+        Returns (session ID, creation timestamp) pairs for all sessions, without copying
+        their data. Each shard is locked only while its pairs are collected.
+        """
+        result = []
+        for sessions, lock in self._shards:
+            with lock:
+                result.extend((session_id, data['created_at_ts']) for session_id, data in sessions.items())
+        return result
+
+    def __len__(self) -> int:
+        return sum(len(sessions) for sessions, _ in self._shards)
+
+# Global store holding data for active processing sessions.
+# Keys are session IDs, values are dictionaries containing BundleProcessor instances and metadata.
+processing_sessions = ShardedSessionStore()
 
-def initialize_session_manager(app_instance: Any, sessions_dict: Dict[str, Any], lock_obj: threading.Lock):
+def initialize_session_manager(app_instance: Any, sessions_store: ShardedSessionStore):
     """
-    Initializes the session manager by associating global session data
-    and lock with the Flask application instance (if needed by context)
+    Initializes the session manager by associating the global session store
+    with the Flask application instance (if needed by context)
     and providing references to other modules.
 
     Args:
         app_instance (Any): The Flask application instance.
-        sessions_dict (Dict[str, Any]): The global dictionary for sessions.
-        lock_obj (threading.Lock): The global lock for sessions.
+        sessions_store (ShardedSessionStore): The global session store.
     """
-    global processing_sessions, session_lock
-    processing_sessions = sessions_dict
-    session_lock = lock_obj
+    global processing_sessions
+    processing_sessions = sessions_store
     logger.info("Session manager initialized.")
 
 def get_session_data(session_id: str) -> Optional[Dict[str, Any]]:
@@ -48,8 +121,7 @@ def get_session_data(session_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         Optional[Dict[str, Any]]: The session data, or None if not found.
     """
-    with session_lock:
-        return processing_sessions.get(session_id)
+    return processing_sessions.get(session_id)
 
 def add_session_data(session_id: str, processor_instance: Any):
     """
@@ -59,11 +131,13 @@ def add_session_data(session_id: str, processor_instance: Any):
         session_id (str): The ID of the new session.
         processor_instance (Any): The BundleProcessor instance for this session.
     """
-    with session_lock:
-        processing_sessions[session_id] = {
-            'processor': processor_instance,
-            'created_at': datetime.now().isoformat()
-        }
+    created_at_ts = time.time()
+    processing_sessions.add(session_id, {
+        'processor': processor_instance,
+        'created_at': datetime.fromtimestamp(created_at_ts).isoformat(),
+        # Epoch seconds, so expiry checks are a float comparison instead of an ISO parse
+        'created_at_ts': created_at_ts
+    })
     logger.debug(f"Session {session_id} added to manager.")
 
 def update_session_status(session_id: str, key: str, value: Any):
@@ -75,42 +149,45 @@ def update_session_status(session_id: str, key: str, value: Any):
         key (str): The key to update (e.g., 'zip_path', 'extraction_completed_at').
         value (Any): The new value for the key.
     """
-    with session_lock:
-        if session_id in processing_sessions:
-            processing_sessions[session_id][key] = value
-            logger.debug(f"Session {session_id} updated: {key} = {value}")
-        else:
-            logger.warning(f"Attempted to update non-existent session {session_id} for key {key}.")
+    if processing_sessions.update(session_id, key, value):
+        logger.debug(f"Session {session_id} updated: {key} = {value}")
+    else:
+        logger.warning(f"Attempted to update non-existent session {session_id} for key {key}.")
 
-def remove_session_data(session_id: str):
+def remove_session_data(session_id: str) -> Optional[Dict[str, Any]]:
     """
     Removes a session's data from the manager in a thread-safe manner.
 
     Args:
         session_id (str): The ID of the session to remove.
-    """
-    with session_lock:
-        if session_id in processing_sessions:
-            del processing_sessions[session_id]
-            logger.debug(f"Session {session_id} removed from manager.")
-        else:
-            logger.warning(f"Attempted to remove non-existent session {session_id}.")
 
-def get_all_sessions() -> Dict[str, Dict[str, Any]]:
+    Returns:
+        Optional[Dict[str, Any]]: The removed session data if this call removed the session,
+                                  None if it was already gone.
     """
-    Returns a copy of all active session data in a thread-safe manner.
+    session_data = processing_sessions.remove(session_id)
+    if session_data is not None:
+        logger.debug(f"Session {session_id} removed from manager.")
+    else:
+        logger.warning(f"Attempted to remove non-existent session {session_id}.")
+    return session_data
+
+def get_session_created_times() -> List[Tuple[str, float]]:
+    """
+    Returns the ID and creation timestamp (epoch seconds) of every active session,
+    for expiry checks that don't need the session data itself.
 
     Returns:
-        Dict[str, Dict[str, Any]]: A copy of the dictionary containing all active sessions.
+        List[Tuple[str, float]]: (session ID, creation timestamp) pairs.
     """
-    with session_lock:
-        return processing_sessions.copy()
+    return processing_sessions.created_times()
 
-def get_session_lock() -> threading.Lock:
+def get_all_sessions() -> Dict[str, Dict[str, Any]]:
     """
-    Provides access to the global session lock.
+    Returns a copy of all active session data in a thread-safe manner.
+    Shards are copied one at a time, never all locked at once.
 
     Returns:
-        threading.Lock: The global session lock.
+        Dict[str, Dict[str, Any]]: A copy of the dictionary containing all active sessions.
     """
-    return session_lock
\ No newline at end of file
+    return processing_sessions.snapshot()
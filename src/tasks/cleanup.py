@@ -10,13 +10,22 @@ This module defines the standalone function for cleaning up old session files an
 import os
 import shutil
 import logging
-from datetime import datetime, timedelta
+import time
+from concurrent.futures import ThreadPoolExecutor
 from flask import Flask
 
-from src.session.manager import get_all_sessions, remove_session_data, get_session_lock
+from src.session.manager import get_session_created_times, remove_session_data
 
 logger = logging.getLogger(__name__)
 
+# Number of orphaned directory trees deleted concurrently during a cleanup run
+_RMTREE_WORKERS = 4
+
+def _remove_orphaned_dir(path: str):
+    """Deletes an orphaned directory tree. Runs on the cleanup's thread pool."""
+    shutil.rmtree(path, ignore_errors=True)
+    logger.info(f"Removed old orphaned directory: {path}")
+
 def cleanup_old_files(app: Flask):
     """
     Iterates through active processing sessions and temporary directories,
@@ -29,35 +38,48 @@ def cleanup_old_files(app: Flask):
     logger.info("Starting cleanup of old files and sessions.")
     
     file_retention_hours = app.config['FILE_RETENTION_HOURS']
-    cutoff = datetime.now() - timedelta(hours=file_retention_hours)
+    cutoff_ts = time.time() - file_retention_hours * 3600
     
-    sessions_to_check = get_all_sessions()
-    session_lock_obj = get_session_lock()
-
-    with session_lock_obj:
-        expired_ids = [sid for sid, data in sessions_to_check.items()
-                       if datetime.fromisoformat(data['created_at']) < cutoff]
-        for session_id in expired_ids:
-            session_data = sessions_to_check.get(session_id)
-            if session_data and 'processor' in session_data:
-                processor = session_data['processor']
-                processor.cleanup()
-                remove_session_data(session_id)
-                logger.info(f"Cleaned up expired session: {session_id}")
+    # Only IDs and timestamps are collected (one shard locked at a time), and each removal only
+    # briefly locks its shard. Processors are cleaned up afterwards, outside any lock.
+    expired_ids = [sid for sid, created_at_ts in get_session_created_times() if created_at_ts < cutoff_ts]
+    removed = []
+    for session_id in expired_ids:
+        # The session may have been removed concurrently (e.g. after its download)
+        session_data = remove_session_data(session_id)
+        if session_data is not None and 'processor' in session_data:
+            removed.append((session_id, session_data['processor']))
+    for session_id, processor in removed:
+        processor.cleanup()
+        logger.info(f"Cleaned up expired session: {session_id}")
     
+    # scandir entries carry their type, and their stat is one call each. Modification times
+    # are compared as integer nanoseconds, exactly as the file system reports them.
+    cutoff_ns = int(cutoff_ts * 1_000_000_000)
+    # Directory trees are only collected here and deleted concurrently afterwards;
+    # each rmtree is thousands of unlink calls, while single files are removed inline
+    dirs_to_remove = []
     for folder in [app.config['UPLOAD_FOLDER'], app.config['OUTPUT_FOLDER'], app.config['SESSION_LOGS_DIR']]:
         if not os.path.exists(folder):
             continue
-        for entry in os.listdir(folder):
-            path = os.path.join(folder, entry)
-            try:
-                if datetime.fromtimestamp(os.path.getmtime(path)) < cutoff:
-                    if os.path.isdir(path):
-                        shutil.rmtree(path, ignore_errors=True)
-                        logger.info(f"Removed old orphaned directory: {path}")
-                    elif os.path.isfile(path):
-                        os.remove(path)
-                        logger.info(f"Removed old orphaned file: {path}")
-            except Exception as e:
-                logger.warning(f"Error during orphaned cleanup of {path}: {e}", exc_info=True)
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                path = entry.path
+                try:
+                    if entry.stat(follow_symlinks=False).st_mtime_ns < cutoff_ns:
+                        if entry.is_dir(follow_symlinks=False):
+                            dirs_to_remove.append(path)
+                        elif entry.is_file(follow_symlinks=False):
+                            os.remove(path)
+                            logger.info(f"Removed old orphaned file: {path}")
+                except Exception as e:
+                    logger.warning(f"Error during orphaned cleanup of {path}: {e}", exc_info=True)
+
+    if dirs_to_remove:
+        with ThreadPoolExecutor(max_workers=min(_RMTREE_WORKERS, len(dirs_to_remove)), thread_name_prefix="OrphanCleanup") as pool:
+            for path, future in [(path, pool.submit(_remove_orphaned_dir, path)) for path in dirs_to_remove]:
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.warning(f"Error during orphaned cleanup of {path}: {e}", exc_info=True)
     logger.info("Cleanup of old files and sessions completed.")
\ No newline at end of file
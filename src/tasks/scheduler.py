@@ -5,10 +5,11 @@ Author: lenzarchive (https://github.com/lenzarchive)
 License: MIT License
 
 This module defines the standalone function for starting a background daemon thread
-that periodically runs the cleanup task.
+that periodically runs the cleanup task. The thread waits on an event rather than
+sleeping, so a cleanup can be requested early and the scheduler stopped promptly.
 """
 
-import time
+import atexit
 import threading
 import logging
 from flask import Flask
@@ -17,6 +18,11 @@ from .cleanup import cleanup_old_files
 
 logger = logging.getLogger(__name__)
 
+# Set to wake the scheduler thread before its interval has elapsed
+_wakeup = threading.Event()
+# Control flag for the scheduler thread to stop gracefully
+_is_running = False
+
 def start_cleanup_scheduler(app: Flask):
     """
     Starts a daemon thread that periodically runs the cleanup task.
@@ -25,14 +31,38 @@ def start_cleanup_scheduler(app: Flask):
     Args:
         app (Flask): The Flask application instance to access configuration and pass to cleanup.
     """
+    global _is_running
+    _is_running = True
+
     def task():
         with app.app_context():
             while True:
-                time.sleep(app.config['CLEANUP_INTERVAL'])
+                _wakeup.wait(app.config['CLEANUP_INTERVAL'])
+                _wakeup.clear()
+                if not _is_running:
+                    break
                 try:
                     cleanup_old_files(app)
                 except Exception as e:
                     logger.error(f"Error in cleanup scheduler thread: {e}", exc_info=True)
+        logger.info("Cleanup scheduler stopped.")
     
     threading.Thread(target=task, daemon=True, name="CleanupScheduler").start()
-    logger.info(f"Cleanup scheduler started with interval {app.config['CLEANUP_INTERVAL']} seconds.")
\ No newline at end of file
+    atexit.register(stop_scheduler)
+    logger.info(f"Cleanup scheduler started with interval {app.config['CLEANUP_INTERVAL']} seconds.")
+
+def request_cleanup():
+    """
+    Wakes the scheduler to run a cleanup now instead of at the end of its interval.
+    Requests made while a cleanup is running are coalesced into one follow-up run.
+    """
+    _wakeup.set()
+
+def stop_scheduler():
+    """
+    Signals the scheduler thread to exit. It wakes immediately, or stops once
+    a cleanup that is already running has finished.
+    """
+    global _is_running
+    _is_running = False
+    _wakeup.set()
@@ -9,13 +9,31 @@ This module provides various general utility functions used across the applicati
 
 import re
 import os
+import functools
 import zlib
+import json
 import struct
 import logging
+import contextlib
+from typing import AbstractSet, Any, Dict, Iterable, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
+# UnityPy objects read through file readers shared by their environment, and lazily loaded
+# payloads (decoded images, audio/font/video data) seek in those readers too. Each
+# BundleProcessor owns a lock for its environment and hands it to the functions touching
+# UnityPy data; this no-op stand-in is their default when only one thread uses the data.
+NO_LOCK = contextlib.nullcontext()
+
+# Characters illegal in filenames on common file systems, plus spaces; each one becomes '_'
+_SANITIZE_RE = re.compile(r'[<>:"/\\|?* ]')
+
 def sanitize_filename(name: str) -> str:
     """
     Sanitizes a string to be a valid filename for safe file system operations.
@@ -29,11 +47,36 @@ def sanitize_filename(name: str) -> str:
     """
     if not isinstance(name, str):
         name = str(name)
-    sane_name = re.sub(r'[<>:"/\\|?*]', '_', name)
-    sane_name = sane_name.replace(' ', '_')
-    sane_name = sane_name.strip('_').strip()
+    return _sanitize_str(name)
+
+# Asset names repeat heavily within a bundle (class names, GameObject names),
+# so sanitized results are memoized; only str keys are cached, which are always hashable.
+@functools.lru_cache(maxsize=4096)
+def _sanitize_str(name: str) -> str:
+    """Cached body of `sanitize_filename` for string input."""
+    sane_name = _SANITIZE_RE.sub('_', name).strip('_').strip()
     return sane_name if sane_name else "Untitled"
 
+# Bundle/compression signatures, matched against the start of a file header
+_COMPRESSION_SIGNATURES = {
+    b'UnityFS\x00': "unityfs",
+    b'UnityRaw': "raw",
+    b'LZ4\x00': "lz4",
+    b'\x78\x9c': "zlib",
+    b'\x78\x01': "zlib",
+    b'\x78\xda': "zlib",
+    b'\x1f\x8b': "gzip",
+}
+
+# The first 8 header bytes are read as one little-endian integer; a signature of n bytes
+# then matches when the integer's low n bytes equal it. Tables are ordered longest first.
+_HEADER_WORD = struct.Struct('<Q')
+_COMPRESSION_SIG_TABLES = tuple(
+    ((1 << (8 * length)) - 1,
+     {int.from_bytes(sig, 'little'): comp_type for sig, comp_type in _COMPRESSION_SIGNATURES.items() if len(sig) == length})
+    for length in sorted({len(sig) for sig in _COMPRESSION_SIGNATURES}, reverse=True)
+)
+
 def detect_compression_type(data: bytes) -> str:
     """
     Detects the file compression type based on common magic numbers or signatures
@@ -48,21 +91,11 @@ def detect_compression_type(data: bytes) -> str:
     """
     if len(data) < 8:
         return "unknown"
-    
-    signatures = {
-        b'UnityFS\x00': "unityfs",
-        b'UnityRaw': "raw",
-        b'LZ4\x00': "lz4",
-        b'\x78\x9c': "zlib",
-        b'\x78\x01': "zlib",
-        b'\x78\xda': "zlib",
-        b'\x1f\x8b': "gzip",
-    }
-    
-    for sig, comp_type in signatures.items():
-        if data.startswith(sig):
+    word = _HEADER_WORD.unpack_from(data)[0]
+    for mask, table in _COMPRESSION_SIG_TABLES:
+        comp_type = table.get(word & mask)
+        if comp_type is not None:
             return comp_type
-    
     return "unknown"
 
 def get_file_info(filepath: str) -> dict:
@@ -78,12 +111,17 @@ def get_file_info(filepath: str) -> dict:
               Returns default values if an error occurs during file reading.
     """
     try:
-        with open(filepath, 'rb') as f:
-            header = f.read(32)
+        # One open/fstat/read on a raw fd instead of a buffered open plus a separate stat by path
+        fd = os.open(filepath, os.O_RDONLY)
+        try:
+            size = os.fstat(fd).st_size
+            header = os.read(fd, 32)
+        finally:
+            os.close(fd)
         
         bundle_info = {
             'signature': header[:8].hex(),
-            'size': os.path.getsize(filepath),
+            'size': size,
             'compression': detect_compression_type(header),
             'version_header_guess': 'Unknown'
         }
@@ -92,17 +130,141 @@ def get_file_info(filepath: str) -> dict:
         logger.error(f"Failed to extract basic file info from {filepath}: {e}", exc_info=True)
         return {'signature': '', 'size': 0, 'compression': 'unknown', 'version_header_guess': 'Unknown'}
 
-def is_allowed_file_extension(filename: str, allowed_extensions: set) -> bool:
+def is_allowed_file_extension(filename: str, allowed_extensions: AbstractSet[str]) -> bool:
     """
     Checks if a file's extension is present in the set of allowed extensions.
 
     Args:
         filename (str): The name of the file.
-        allowed_extensions (set): A set of lowercase allowed file extensions (e.g., {'bundle', 'unity3d'}).
+        allowed_extensions (AbstractSet[str]): A set of lowercase allowed file extensions (e.g., {'bundle', 'unity3d'}).
 
     Returns:
         bool: True if the extension is allowed, False otherwise.
     """
-    if '.' not in filename:
-        return False
-    return filename.rsplit('.', 1)[1].lower() in allowed_extensions
\ No newline at end of file
+    if not isinstance(allowed_extensions, frozenset):
+        allowed_extensions = frozenset(allowed_extensions)
+    return filename.lower().endswith(_extension_suffixes(allowed_extensions))
+
+@functools.lru_cache(maxsize=8)
+def _extension_suffixes(allowed_extensions: frozenset) -> Tuple[str, ...]:
+    """Returns the '.ext' suffixes for a set of extensions, for a single `str.endswith` check."""
+    return tuple(f".{ext.lower()}" for ext in allowed_extensions)
+
+def copy_file_range_fd(src_fd: int, dst_fd: int, offset: int, count: int):
+    """
+    Copies `count` bytes starting at `offset` of one file descriptor to the current
+    position of another, entirely in the kernel. Uses os.copy_file_range first, which
+    becomes a zero-byte reflink on copy-on-write filesystems (btrfs, XFS), and falls
+    back to os.sendfile when the filesystems or platform don't support it.
+
+    Args:
+        src_fd (int): The source file descriptor.
+        dst_fd (int): The destination file descriptor.
+        offset (int): The position in the source file to copy from.
+        count (int): The number of bytes to copy.
+
+    Raises:
+        OSError: If neither kernel-side copy mechanism is available for these files.
+    """
+    end = offset + count
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while offset < end:
+                copied = os.copy_file_range(src_fd, dst_fd, end - offset, offset)
+                if copied == 0:
+                    return
+                offset += copied
+            return
+        except OSError:
+            # e.g. EXDEV across filesystems on older kernels; continue with sendfile
+            pass
+    while offset < end:
+        sent = os.sendfile(dst_fd, src_fd, offset, end - offset)
+        if sent == 0:
+            return
+        offset += sent
+
+def object_fields(data: Any, names: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    Returns a mapping of a UnityPy object's fields, for reading several attributes
+    with plain dict lookups. Uses the instance `__dict__` directly when there is one,
+    and collects only the requested names for slotted classes.
+
+    Args:
+        data (Any): The UnityPy object data.
+        names (Tuple[str, ...]): The fields the caller needs, used when there is no `__dict__`.
+
+    Returns:
+        Dict[str, Any]: Field names mapped to their values; missing fields are absent.
+    """
+    fields = getattr(data, '__dict__', None)
+    if fields is not None:
+        return fields
+    return {name: getattr(data, name) for name in names if hasattr(data, name)}
+
+def write_bytes_file(path: str, data: bytes):
+    """
+    Writes a bytes payload to a new file (or truncates an existing one) with raw
+    os.open/os.write calls, avoiding the buffered file object for single-shot writes.
+
+    Args:
+        path (str): The file to write.
+        data (bytes): The complete file contents.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        # os.write may write less than requested for large payloads
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+def dump_json_bytes(obj: Any) -> bytes:
+    """
+    Serializes an object to 2-space indented UTF-8 JSON, using orjson when it's
+    installed and the standard library otherwise. orjson also encodes NumPy arrays
+    natively; values neither encoder handles are converted with str().
+
+    Args:
+        obj (Any): The object to serialize.
+
+    Returns:
+        bytes: The encoded JSON document.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except orjson.JSONEncodeError:
+            # orjson rejects nesting beyond 255 levels, integers beyond 64 bits and lone
+            # surrogates; the standard library encodes all of them
+            pass
+    return json.dumps(obj, indent=2, ensure_ascii=False, default=str).encode('utf-8', errors='replace')
+
+def dump_json_lines_bytes(records: Iterable[Any]) -> bytes:
+    """
+    Serializes records to newline-delimited JSON (one compact UTF-8 document per line),
+    using orjson when it's installed and the standard library otherwise.
+
+    Args:
+        records (Iterable[Any]): The records to serialize.
+
+    Returns:
+        bytes: The encoded lines, each terminated by a newline.
+    """
+    if orjson is None:
+        return b''.join(_dump_json_line_stdlib(record) for record in records)
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+    lines = []
+    for record in records:
+        try:
+            lines.append(orjson.dumps(record, default=str, option=option))
+        except orjson.JSONEncodeError:
+            # Same fallback as `dump_json_bytes`, per record
+            lines.append(_dump_json_line_stdlib(record))
+    return b''.join(lines)
+
+def _dump_json_line_stdlib(record: Any) -> bytes:
+    """Encodes one NDJSON line with the standard library."""
+    return json.dumps(record, ensure_ascii=False, default=str).encode('utf-8', errors='replace') + b'\n'
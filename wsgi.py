@@ -22,7 +22,7 @@ sys.path.insert(0, str(project_dir))
 from app import app
 from src.config import Config # Import configuration
 from src.tasks.scheduler import start_cleanup_scheduler # Import cleanup scheduler
-from src.session.manager import processing_sessions, session_lock, initialize_session_manager # Import manager for WSGI context
+from src.session.manager import processing_sessions, initialize_session_manager # Import manager for WSGI context
 from src.queue_manager.worker_pool import WorkerPool # Import WorkerPool for WSGI context
 
 # Apply production configuration directly or via environment variables
@@ -75,7 +75,7 @@ os.makedirs(Config.OUTPUT_FOLDER, exist_ok=True)
 os.makedirs(Config.SESSION_LOGS_DIR, exist_ok=True)
 
 # Initialize the session manager for the WSGI context
-initialize_session_manager(app, processing_sessions, session_lock)
+initialize_session_manager(app, processing_sessions)
 
 # Start the cleanup scheduler in the WSGI context
 start_cleanup_scheduler(app)